@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""Times Krossbones' hot paths against a synthetic RDRAM image.
+
+Results are printed as JSON (or written with --output) so runs can be
+compared between releases:
+
+    python benchmark.py --output before.json
+
+Attach and poll benchmarks need nothing but the standard library. Icon
+resolution and atlas rasterizing need Pillow, and the canvas rebuild needs
+a display, pass --xvfb to start a virtual one when there isn't.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import Future
+
+from loader import EMULATOR_CONFIGS, RAMB_OFFSET, Emulators
+from modules.client import N64MemoryClient
+from modules.items import build_item_data, build_read_plan
+from modules.memory_map import DK64MemoryMap
+from modules.poller import GAMEPLAY_MODE, MODE_ADDRESS, ItemPoller
+from modules.replay import RDRAM_SIZE, REPLAY_RDRAM_BASE, ReplayFrame, ReplayProcessTable, ReplaySource, swizzle
+
+DEFAULT_SCAN_DEPTH = 0x100000  # Noise the attach scan reads through before finding RDRAM
+DENSE_POINTER_SPACING = 0x1000  # Bytes between decoy pointers into RDRAM in the dense attach scan
+COUNT_STRUCT_ADDRESS = 0x80700000
+BENCHMARK_SCALES = (20, 30)  # UI scales the atlas and canvas benchmarks alternate between
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+def synthetic_rdram(seed: int = 0) -> bytearray:
+    """An RDRAM image (N64 byte order) that looks enough like DK64 mid-game to track."""
+    rng = random.Random(seed)
+    rdram = bytearray(RDRAM_SIZE)
+
+    def put(address, data):
+        address &= 0x7FFFFFFF
+        rdram[address:address + len(data)] = data
+
+    put(0x80759290, b"RAMB")
+    put(MODE_ADDRESS, bytes([GAMEPLAY_MODE]))
+    put(DK64MemoryMap.map_index, (0x22).to_bytes(4, "big"))
+    put(DK64MemoryMap.count_struct_pointer, COUNT_STRUCT_ADDRESS.to_bytes(4, "big"))
+    put(COUNT_STRUCT_ADDRESS, rng.randbytes(0x20))
+    put(0x807FC950, rng.randbytes(0x5E * 5))
+    put(0x807ECEA8, rng.randbytes(0x80))
+    return rdram
+
+def peak_rss_kb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+def percentile(sorted_values, fraction):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+def measure(fn, iterations, warmup=1, setup=None):
+    """Time fn() over a number of iterations, calling setup() untimed before each."""
+    for _ in range(warmup):
+        if setup is not None:
+            setup()
+        fn()
+    times = []
+    for _ in range(iterations):
+        if setup is not None:
+            setup()
+        start = time.perf_counter_ns()
+        fn()
+        times.append(time.perf_counter_ns() - start)
+    times.sort()
+    total = sum(times)
+    return {
+        "iterations": iterations,
+        "ops_per_sec": round(iterations / (total / 1e9), 2) if total else None,
+        "p50_ms": round(percentile(times, 0.50) / 1e6, 4),
+        "p99_ms": round(percentile(times, 0.99) / 1e6, 4),
+        "peak_rss_kb": peak_rss_kb(),
+    }
+
+def bench_attach(source, iterations, scan_depth):
+    results = {}
+    for emulator in Emulators:
+        info = EMULATOR_CONFIGS[emulator]
+        depth = min(scan_depth, info.upper_offset_range - info.lower_offset_range - 8)
+        processes = ReplayProcessTable(source, emulator, depth)
+
+        reads = {}
+
+        def attach():
+            if info.attach_to_emulator(None, processes) is None:
+                raise RuntimeError(f"Attach failed for {emulator.name}")
+            reads.update(info.connected_process.accounting.snapshot()["callers"])
+            info.disconnect()
+
+        results[emulator.name] = measure(attach, iterations)
+        results[emulator.name]["scan_depth"] = depth
+        results[emulator.name]["syscalls_per_attach"] = sum(caller["syscalls"] for caller in reads.values())
+    return results
+
+def dense_filler(size: int, extra_offset: int, seed: int = 0) -> bytes:
+    """Noise with no empty pages, and now and then a pointer into RDRAM that isn't the one being looked for."""
+    rng = random.Random(seed)
+    filler = bytearray(rng.randbytes(size))
+    for offset in range(0, size - 8, DENSE_POINTER_SPACING):
+        target = rng.randrange(1, (RDRAM_SIZE - RAMB_OFFSET - 4) // 4) * 4
+        filler[offset:offset + 8] = (REPLAY_RDRAM_BASE - extra_offset + target).to_bytes(8, "little")
+    return filler
+
+def bench_attach_dense(source, iterations, seed):
+    """Scan the whole offset range of every emulator found through a pointer, all of it dense."""
+    results = {}
+    for emulator in Emulators:
+        info = EMULATOR_CONFIGS[emulator]
+        if not info.additional_lookup:
+            continue
+        depth = (info.upper_offset_range - info.lower_offset_range - 8) // info.range_step * info.range_step
+        processes = ReplayProcessTable(source, emulator, filler=dense_filler(depth, info.extra_offset, seed))
+
+        def attach():
+            if info.attach_to_emulator(None, processes) is None:
+                raise RuntimeError(f"Attach failed for {emulator.name}")
+            info.disconnect()
+
+        results[emulator.name] = measure(attach, iterations)
+        results[emulator.name]["scan_depth"] = depth
+    return results
+
+def connect(source):
+    info = EMULATOR_CONFIGS[Emulators.RMG]
+    info.attach_to_emulator(None, ReplayProcessTable(source, Emulators.RMG))
+    return info
+
+def bench_poll(source, iterations):
+    info = connect(source)
+    item_data = build_item_data()
+    read_plan = build_read_plan(item_data)
+    poller = ItemPoller(N64MemoryClient(info), read_plan, item_data)
+    accounting = info.connected_process.accounting
+    accounting.reset()
+    result = measure(poller.poll, iterations)
+    reads = accounting.snapshot()
+    result["syscalls_per_poll"] = reads["callers"]["poll"]["syscalls_per_call"]
+    result["bytes_per_poll"] = reads["callers"]["poll"]["bytes_per_call"]
+    result["sources"] = reads["sources"]
+    result["plan"] = read_plan.describe()
+    info.disconnect()
+    return result
+
+def load_inventory():
+    """Import the UI side, which needs tkinter and Pillow but not a display."""
+    from modules.inventory import Inventory
+    inventory = Inventory()
+    inventory.debug_output = None
+    return inventory
+
+def bench_icons(inventory, iterations):
+    rng = random.Random(1)
+    states = [[rng.randrange(3) for _ in inventory.item_data] for _ in range(64)]
+    every_icon = range(len(inventory.compiled_icons))
+
+    def set_state():
+        inventory.counts[:] = rng.choice(states)
+        for item, count in zip(inventory.item_data, inventory.counts):
+            item.count = count
+
+    def resolve_all():
+        for index in every_icon:
+            inventory.compiled_icons[index].resolve(inventory.counts)
+
+    def forget():
+        set_state()
+        for compiled in inventory.compiled_icons:
+            compiled.variants.clear()
+
+    return {
+        "resolve_cold": measure(resolve_all, iterations, setup=forget),
+        "resolve_warm": measure(resolve_all, iterations, warmup=len(states) * 4, setup=set_state),
+    }
+
+def bench_atlas(inventory, iterations):
+    from modules.atlas import SpriteAtlas
+    atlas = SpriteAtlas()
+    # Decoding happens once at startup, only time the rasterizing done on every scale change
+    atlas.load({path for path, _ in inventory.icon_variants(BENCHMARK_SCALES[0])})
+    scales = list(BENCHMARK_SCALES)
+
+    def prepare():
+        scales.reverse()
+        atlas.prepare(inventory.icon_variants(scales[0]), scales[0])
+
+    return measure(prepare, iterations)
+
+def start_xvfb():
+    """Start a virtual framebuffer if there is no display, returning the process to stop later."""
+    if os.environ.get("DISPLAY") or sys.platform in ("win32", "darwin"):
+        return None
+    if shutil.which("Xvfb") is None:
+        raise RuntimeError("Xvfb not found")
+    display = f":{random.randrange(100, 1000)}"
+    process = subprocess.Popen(["Xvfb", display, "-screen", "0", "1280x1024x24", "-nolisten", "tcp"], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    time.sleep(0.5)
+    os.environ["DISPLAY"] = display
+    return process
+
+def bench_canvas(inventory, iterations):
+    import tkinter as tk
+    from modules import preferences
+    root = tk.Tk()
+    # Building the UI saves preferences, keep them away from the real ones
+    temp_folder = tempfile.TemporaryDirectory()
+    preferences._store = preferences.PreferenceStore(os.path.join(temp_folder.name, preferences.PREFERENCE_JSON))
+    try:
+        inventory.items_ui(root)
+        inventory.show_items_frame()
+        layer = inventory.layer
+        generations = {scale: layer.atlas.prepare(inventory.icon_variants(scale), scale) for scale in BENCHMARK_SCALES}
+        every_icon = range(len(inventory.compiled_icons))
+        scales = list(BENCHMARK_SCALES)
+
+        def swap_scale():
+            # Hand over an already rendered scale, the way the rasterizer thread would
+            scales.reverse()
+            future = Future()
+            future.set_result(generations[scales[0]])
+            layer.requested_scale = scales[0]
+            layer.pending_scale = (scales[0], future)
+
+        def rebuild():
+            layer.apply_ready_scale()
+            inventory.redraw_icons(every_icon)
+            root.update()
+
+        return measure(rebuild, iterations, setup=swap_scale)
+    finally:
+        if inventory.layer is not None:
+            inventory.layer.close()
+        root.destroy()
+        preferences.get_store().flush()
+        preferences._store = None
+        temp_folder.cleanup()
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Krossbones' attach, poll and render paths.")
+    parser.add_argument("--output", metavar="PATH", help="write the JSON results here instead of stdout")
+    parser.add_argument("--iterations", type=int, default=200, help="iterations for the fast benchmarks (default: 200)")
+    parser.add_argument("--attach-iterations", type=int, default=10, help="iterations of each attach scan (default: 10)")
+    parser.add_argument("--scan-depth", type=lambda value: int(value, 0), default=DEFAULT_SCAN_DEPTH, help="bytes of noise before RDRAM in each attach scan")
+    parser.add_argument("--xvfb", action="store_true", help="start a virtual framebuffer for the canvas benchmark if there is no display")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the synthetic RDRAM image")
+    args = parser.parse_args()
+
+    # Icons and preferences are found relative to the project
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    source = ReplaySource([ReplayFrame(0.0, bytes(swizzle(synthetic_rdram(args.seed))))])
+    results = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "benchmarks": {},
+        "skipped": {},
+    }
+    benchmarks = results["benchmarks"]
+    benchmarks["attach"] = bench_attach(source, args.attach_iterations, args.scan_depth)
+    benchmarks["attach_dense"] = bench_attach_dense(source, args.attach_iterations, args.seed)
+    benchmarks["poll"] = bench_poll(source, args.iterations)
+
+    inventory = None
+    try:
+        inventory = load_inventory()
+    except ImportError as e:
+        results["skipped"]["icons"] = results["skipped"]["atlas"] = results["skipped"]["canvas"] = str(e)
+    if inventory is not None:
+        benchmarks["icons"] = bench_icons(inventory, args.iterations)
+        benchmarks["atlas"] = bench_atlas(inventory, max(1, args.iterations // 20))
+        xvfb = None
+        try:
+            if args.xvfb:
+                xvfb = start_xvfb()
+            benchmarks["canvas"] = bench_canvas(inventory, max(1, args.iterations // 4))
+        except Exception as e:
+            results["skipped"]["canvas"] = str(e)
+        finally:
+            if xvfb is not None:
+                xvfb.terminate()
+
+    results["peak_rss_kb"] = peak_rss_kb()
+    text = json.dumps(results, indent=4)
+    if args.output:
+        with open(args.output, "w") as fh:
+            fh.write(text + "\n")
+    else:
+        sys.stdout.write(text + "\n")
+
+if __name__ == "__main__":
+    main()
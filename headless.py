@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""Krossbones without a window, streaming item changes as newline-delimited JSON.
+
+Nothing here imports tkinter or PIL. Every line written is one JSON object
+with an "event" field:
+
+    status  connection changes ("message", "state")
+    state   everything at once, sent after connecting and to new socket clients
+    items   only the item counts which changed since the last line
+    game    the game mode or map changed ("in_game", "map")
+    error   reading memory started failing ("message"), or recovered (null)
+"""
+
+import argparse
+import json
+import logging
+import os
+import queue
+import socket
+import sys
+import time
+from typing import Optional
+
+from loader import Emulators
+from modules.connection import KBConnection
+from modules.core import KrossbonesCore
+from modules.items import build_item_data, build_read_plan
+from modules.poller import ItemSnapshot
+from modules.preferences import get_preference
+from modules.replay import ReplayProcessTable, ReplaySource
+
+RECONNECT_DELAY = 2.0  # Seconds between connection attempts
+ERROR_RECONNECT_AFTER = 5.0  # Seconds of failed reads before reconnecting, eg. after the emulator closes
+SNAPSHOT_WAIT = 1.0  # Longest wait for a snapshot, so new socket clients are still accepted
+SOCKET_SEND_TIMEOUT = 0.5  # Clients slower than this get dropped instead of stalling everyone
+STATUS_STATES = {"green": "connected", "orange": "connecting", "red": "disconnected"}
+
+class StdoutOutput:
+    def accept(self, greeting):
+        return
+
+    def send(self, line: str):
+        sys.stdout.write(line)
+        sys.stdout.flush()
+
+    def close(self):
+        return
+
+class SocketOutput:
+    """Broadcasts lines to everything connected to a Unix socket."""
+
+    def __init__(self, path: str):
+        self.path = path
+        if os.path.exists(path):
+            os.unlink(path)
+        self.server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.server.bind(path)
+        self.server.listen()
+        self.server.setblocking(False)
+        self.clients = []
+
+    def accept(self, greeting):
+        """Take any waiting clients, sending them greeting() first."""
+        while True:
+            try:
+                client, _ = self.server.accept()
+            except BlockingIOError:
+                return
+            client.settimeout(SOCKET_SEND_TIMEOUT)
+            line = greeting()
+            if line is not None and not self._send_to(client, line):
+                continue
+            self.clients.append(client)
+
+    def _send_to(self, client: socket.socket, line: str) -> bool:
+        try:
+            client.sendall(line.encode())
+            return True
+        except OSError:
+            client.close()
+            return False
+
+    def send(self, line: str):
+        self.clients = [client for client in self.clients if self._send_to(client, line)]
+
+    def close(self):
+        for client in self.clients:
+            client.close()
+        self.server.close()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+class StatusEmitter:
+    """Stands in for the UI's status label, turning status changes into events."""
+
+    def __init__(self, tracker: "HeadlessKrossbones"):
+        self.tracker = tracker
+        self.last = None
+
+    def config(self, text: str = "", foreground: str = ""):
+        status = (text, STATUS_STATES.get(foreground, foreground))
+        # Retrying every few seconds would otherwise repeat "No emulator found" forever
+        if status == self.last:
+            return
+        self.last = status
+        self.tracker.emit("status", message=status[0], state=status[1])
+
+class HeadlessKrossbones(KBConnection, KrossbonesCore):
+    """Krossbones connection and item logic, reporting to a stream instead of a window."""
+
+    def __init__(self, output, verbose: bool = False, record: bool = False):
+        KBConnection.__init__(self)
+        self.output = output
+        self.verbose = verbose
+        self.record = record
+        self.debug_output = None
+        self.status_label = StatusEmitter(self)
+        self.item_data = build_item_data()
+        self.read_plan = build_read_plan(self.item_data)
+        self.poller = None
+        self.snapshot: Optional[ItemSnapshot] = None
+        self.error_since: Optional[float] = None
+
+    def emit(self, event: str, **fields):
+        self.output.send(json.dumps({"event": event, "time": time.time(), **fields}) + "\n")
+
+    def log_debug(self, message: str):
+        if self.verbose:
+            print(message, file=sys.stderr)
+
+    def record_sessions(self) -> bool:
+        return self.record
+
+    def start_polling(self):
+        self.snapshot = None
+        self.error_since = None
+        super().start_polling()
+
+    def frame_loop(self):
+        # Called once connected, run() does the looping here
+        return
+
+    def state_line(self) -> Optional[str]:
+        if self.snapshot is None:
+            return None
+        snapshot = self.snapshot
+        items = {item.name: count for item, count in zip(self.item_data, snapshot.counts)}
+        return json.dumps({
+            "event": "state",
+            "time": time.time(),
+            "in_game": snapshot.in_game,
+            "map": snapshot.map_index,
+            "error": snapshot.error,
+            "items": items,
+        }) + "\n"
+
+    def process(self, snapshot: ItemSnapshot):
+        """Emit whatever changed between the last snapshot and this one."""
+        previous = self.snapshot
+        self.snapshot = snapshot
+        if snapshot.error is None:
+            self.error_since = None
+        elif self.error_since is None:
+            self.error_since = snapshot.time
+        if previous is None:
+            self.output.send(self.state_line())
+            return
+        if snapshot.error != previous.error:
+            self.emit("error", message=snapshot.error)
+        if snapshot.in_game != previous.in_game or snapshot.map_index != previous.map_index:
+            self.emit("game", in_game=snapshot.in_game, map=snapshot.map_index)
+        if snapshot.counts != previous.counts:
+            changed = {
+                item.name: count
+                for item, count, old in zip(self.item_data, snapshot.counts, previous.counts)
+                if count != old
+            }
+            self.emit("items", items=changed)
+
+    def run(self):
+        try:
+            while True:
+                self.output.accept(self.state_line)
+                if self.poller is None:
+                    self.connect_internal()
+                    if self.poller is None:
+                        # Found nothing, or only a partial connection, try again shortly
+                        if self.memory_client:
+                            self.disconnect()
+                        time.sleep(RECONNECT_DELAY)
+                    continue
+                try:
+                    snapshot = self.poller.snapshots.get(timeout=SNAPSHOT_WAIT)
+                except queue.Empty:
+                    continue
+                self.process(snapshot)
+                if self.error_since is not None and time.monotonic() - self.error_since >= ERROR_RECONNECT_AFTER:
+                    # The poller never gives up by itself, start over so a restarted emulator is found
+                    self.log_debug(f"Reads failing for {ERROR_RECONNECT_AFTER}s, reconnecting")
+                    self.disconnect()
+        finally:
+            try:
+                self.disconnect()
+                self.close_session()
+            finally:
+                self.output.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Run Krossbones without a window, writing item changes as JSON lines.")
+    parser.add_argument("--socket", metavar="PATH", help="serve the stream on a Unix socket instead of stdout")
+    parser.add_argument("--verbose", action="store_true", help="write connection logs to stderr")
+    parser.add_argument("--replay", metavar="PATH", help="play back an RDRAM dump, or a JSON manifest of dumps, instead of reading an emulator")
+    parser.add_argument("--emulator", default=Emulators.RMG.name, choices=[emulator.name for emulator in Emulators], help="emulator whose memory layout the replay imitates")
+    parser.add_argument("--record", action="store_true", default=None, help="record the session to the sessions folder (default: the record_sessions preference)")
+    args = parser.parse_args()
+    # Loader logging goes to stderr, stdout is only for the stream
+    logging.basicConfig(stream=sys.stderr, level=logging.INFO if args.verbose else logging.WARNING, format="%(message)s")
+
+    if args.socket:
+        if not hasattr(socket, "AF_UNIX"):
+            parser.error("Unix sockets are not supported on this platform")
+        output = SocketOutput(args.socket)
+    else:
+        output = StdoutOutput()
+
+    record = args.record if args.record is not None else get_preference("record_sessions")
+    tracker = HeadlessKrossbones(output, args.verbose, record)
+    source = None
+    if args.replay:
+        source = ReplaySource.from_path(args.replay)
+        tracker.process_table = ReplayProcessTable(source, Emulators[args.emulator])
+    try:
+        tracker.run()
+    except KeyboardInterrupt:
+        pass
+    except BrokenPipeError:
+        # Whatever was reading stdout went away, don't complain about it on the way out
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+    finally:
+        if source is not None:
+            source.close()
+
+if __name__ == "__main__":
+    main()
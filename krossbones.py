@@ -1,10 +1,16 @@
 #!/usr/bin/env python3
 
+import argparse
+import logging
 import tkinter as tk
 from tkinter import ttk
 
 from modules.connection import KBConnection
 from modules.inventory import Inventory
+from modules.preferences import get_preference
+from modules.replay import ReplayProcessTable, ReplaySource
+from modules.stats import STATS
+from loader import Emulators
 
 class Krossbones(KBConnection, Inventory):
     """Krossbones using official loader connection logic."""
@@ -22,6 +28,7 @@ class Krossbones(KBConnection, Inventory):
         self.root.iconphoto(True, icon)
         self.debug_output = None
         self.mem_client_state = False
+        STATS.set_enabled(get_preference("collect_stats"))
         
         # Processing
         self.last_process_frame = 0
@@ -36,9 +43,14 @@ class Krossbones(KBConnection, Inventory):
         self.items_ui(main_frame)
 
         # Debug Stuff
-        # self.debug_ui(main_frame)
+        if get_preference("show_debug_panel"):
+            self.debug_ui(main_frame)
+            # The items UI is built before there's a debug output to report to
+            self.log_debug(f"Read plan: {self.read_plan.describe()}")
+            self.log_debug(f"Sprite atlas: {self.layer.atlas.describe()}")
 
     def frame_loop(self):
+        start = STATS.start()
         if self.memory_client:
             if not self.mem_client_state:
                 self.show_items_frame()
@@ -48,12 +60,32 @@ class Krossbones(KBConnection, Inventory):
             if self.mem_client_state:
                 self.hide_items_frame()
                 self.mem_client_state = False
+        STATS.stop("frame", start)
         self.root.after(int(1000 / 10), self.frame_loop)
     
     def run(self):
         """Run the application."""
-        self.root.mainloop()
+        try:
+            self.root.mainloop()
+        finally:
+            self.close_session()
+            if self.layer is not None:
+                self.layer.close()
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Krossbones autotracker for DK64 Randomizer.")
+    parser.add_argument("--replay", metavar="PATH", help="play back an RDRAM dump, or a JSON manifest of dumps, instead of reading an emulator")
+    parser.add_argument("--emulator", default=Emulators.RMG.name, choices=[emulator.name for emulator in Emulators], help="emulator whose memory layout the replay imitates")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
     app = Krossbones()
-    app.run()
+    source = None
+    if args.replay:
+        source = ReplaySource.from_path(args.replay)
+        app.process_table = ReplayProcessTable(source, Emulators[args.emulator])
+    try:
+        app.run()
+    finally:
+        if source is not None:
+            source.close()
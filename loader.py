@@ -2,17 +2,41 @@
 
 import platform
 import os
+import json
+import logging
+import sys
 import struct
 import glob
+import array
+import bisect
+import math
+import threading
+import time
 from typing import Optional, Tuple, List, Dict, Any
 from enum import IntEnum, auto
 
+from modules.accounting import ReadAccounting
+
 # Heavily based on the autoconnector work in GSTHD by JXJacob
 
+# Progress and attach failures, which the tracker sends to stderr
+log = logging.getLogger(__name__)
+
 # Detect operating system
 IS_WINDOWS = platform.system() == "Windows"
 IS_LINUX = platform.system() == "Linux"
 
+# RDRAM signature scanning
+RAMB_SIGNATURE = 0x52414D42
+RAMB_OFFSET = 0x759290
+SCAN_CHUNK_SIZE = 0x100000
+SCAN_PAGE_SIZE = 0x1000
+SCAN_PREFIX_LIMIT = 16  # Most pointer prefixes searched for directly, past this every candidate is checked
+
+# Offsets found by previous scans, reused while the same emulator process is running
+ATTACH_CACHE_JSON = "attach_cache.json"
+_attach_cache_lock = threading.Lock()
+
 # Windows API constants and structures
 if IS_WINDOWS:
     import ctypes
@@ -56,6 +80,34 @@ if IS_WINDOWS:
             ("szExeFile", ctypes.c_char * MAX_PATH),
         ]
 
+# Linux process_vm_readv structures
+if IS_LINUX:
+    import ctypes
+    import errno
+
+    IOV_MAX = 1024
+
+    class IOVEC(ctypes.Structure):
+        _fields_ = [
+            ("iov_base", ctypes.c_void_p),
+            ("iov_len", ctypes.c_size_t),
+        ]
+
+    try:
+        _libc = ctypes.CDLL(None, use_errno=True)
+        _process_vm_readv = _libc.process_vm_readv
+        _process_vm_readv.argtypes = [
+            ctypes.c_int,
+            ctypes.POINTER(IOVEC),
+            ctypes.c_ulong,
+            ctypes.POINTER(IOVEC),
+            ctypes.c_ulong,
+            ctypes.c_ulong,
+        ]
+        _process_vm_readv.restype = ctypes.c_ssize_t
+    except (OSError, AttributeError):
+        _process_vm_readv = None
+
 
 def get_running_processes() -> List[Dict[str, Any]]:
     """Get list of running processes using native OS methods."""
@@ -111,14 +163,12 @@ def _get_linux_processes() -> List[Dict[str, Any]]:
                 pid = int(os.path.basename(pid_dir))
                 
                 # Read process name from /proc/pid/comm
-                comm_path = os.path.join(pid_dir, 'comm')
-                if os.path.exists(comm_path):
-                    with open(comm_path, 'r') as f:
-                        process_name = f.read().strip()
-                        processes.append({
-                            'name': process_name,
-                            'pid': pid
-                        })
+                with open(os.path.join(pid_dir, 'comm'), 'r') as f:
+                    process_name = f.read().strip()
+                    processes.append({
+                        'name': process_name,
+                        'pid': pid
+                    })
             except (ValueError, OSError, IOError):
                 # Skip invalid PIDs or inaccessible processes
                 continue
@@ -127,40 +177,72 @@ def _get_linux_processes() -> List[Dict[str, Any]]:
     
     return processes
 
+class ProcessTable:
+    """Snapshot of the running processes, taken once and shared between attach attempts."""
+
+    def __init__(self, processes: Optional[List[Dict[str, Any]]] = None):
+        self.processes = get_running_processes() if processes is None else processes
+        self.names = [(proc["name"].lower(), proc) for proc in self.processes if proc["name"]]
+        self.matches: Dict[str, Optional[Dict[str, Any]]] = {}
+        self.lock = threading.Lock()
+
+    def find(self, process_name: str) -> Optional[Dict[str, Any]]:
+        """Get the first process whose name starts with the given name."""
+        prefix = process_name.lower()
+        with self.lock:
+            if prefix not in self.matches:
+                self.matches[prefix] = next((proc for name, proc in self.names if name.startswith(prefix)), None)
+            return self.matches[prefix]
+
+    def open(self, proc: Dict[str, Any]) -> "ProcessMemory":
+        """Open a process found by find() for memory reads."""
+        return ProcessMemory(proc["name"], proc["pid"])
+
+
 class ProcessMemory:
     """Class to handle process memory operations using ctypes on Windows and Linux."""
     
-    def __init__(self, process_name: str):
+    def __init__(self, process_name: str, pid: Optional[int] = None):
         self.process_name = process_name
         self.process_handle = None
-        self.process_id = None
+        self.process_id = pid
         self.mem_file = None  # For Linux /proc/pid/mem
-        self._attach_to_process()
+        self.use_vm_readv = IS_LINUX and _process_vm_readv is not None
+        self.file_lock = threading.Lock()  # seek + read on mem_file isn't atomic
+        self.accounting = ReadAccounting()
+        self._open()
+
+    def _open(self):
+        """Get ready to read, overridden by memory that doesn't come from a live process."""
+        if self.process_id is None:
+            self._attach_to_process()
+        else:
+            self._open_process()
     
     def _attach_to_process(self):
         """Attach to the process by name."""
-        processes = get_running_processes()
-        
-        for proc in processes:
-            if proc["name"] and proc["name"].lower().startswith(self.process_name.lower()):
-                self.process_id = proc["pid"]
-                
-                if IS_WINDOWS:
-                    self.process_handle = ctypes.windll.kernel32.OpenProcess(
-                        PROCESS_VM_READ | PROCESS_VM_OPERATION | PROCESS_QUERY_INFORMATION,
-                        False,
-                        self.process_id
-                    )
-                    if not self.process_handle:
-                        raise Exception(f"Failed to open process {self.process_name}")
-                elif IS_LINUX:
-                    # On Linux, we'll open /proc/pid/mem for memory access
-                    try:
-                        self.mem_file = open(f"/proc/{self.process_id}/mem", "r+b")
-                    except (OSError, IOError) as e:
-                        raise Exception(f"Failed to open memory file for process {self.process_name}: {e}")
-                return
-        raise Exception(f"Process {self.process_name} not found")
+        proc = ProcessTable().find(self.process_name)
+        if proc is None:
+            raise Exception(f"Process {self.process_name} not found")
+        self.process_id = proc["pid"]
+        self._open_process()
+
+    def _open_process(self):
+        """Open the process for memory reads."""
+        if IS_WINDOWS:
+            self.process_handle = ctypes.windll.kernel32.OpenProcess(
+                PROCESS_VM_READ | PROCESS_VM_OPERATION | PROCESS_QUERY_INFORMATION,
+                False,
+                self.process_id
+            )
+            if not self.process_handle:
+                raise Exception(f"Failed to open process {self.process_name}")
+        elif IS_LINUX:
+            # On Linux, we'll open /proc/pid/mem for memory access
+            try:
+                self.mem_file = open(f"/proc/{self.process_id}/mem", "r+b")
+            except (OSError, IOError) as e:
+                raise Exception(f"Failed to open memory file for process {self.process_name}: {e}")
     
     def list_modules(self):
         """List modules in the process."""
@@ -238,6 +320,50 @@ class ProcessMemory:
         
         return modules
     
+    def readable_regions(self) -> Optional[List[Tuple[int, int]]]:
+        """Get the sorted (start, end) ranges of readable memory, or None if unknown on this OS."""
+        if not IS_LINUX or not self.process_id:
+            return None
+
+        regions = []
+        try:
+            with open(f"/proc/{self.process_id}/maps", "r") as maps_file:
+                for line in maps_file:
+                    parts = line.split()
+                    if len(parts) >= 2 and parts[1].startswith("r"):
+                        start, end = parts[0].split("-")
+                        regions.append((int(start, 16), int(end, 16)))
+        except (OSError, IOError):
+            return None
+        return regions
+
+    def read_chunks(self, start: int, end: int, overlap: int = 0):
+        """Yield (address, data) for the readable parts of [start, end) in large chunks.
+
+        Each chunk carries up to `overlap` extra bytes past its end, within the
+        same readable region, so values straddling a chunk boundary can be read.
+        """
+        regions = self.readable_regions()
+        if regions is None:
+            spans = [(start, end)]
+        else:
+            spans = [(max(r_start, start), r_end) for r_start, r_end in regions if r_start < end and r_end > start]
+        for span_start, span_end in spans:
+            scan_end = min(span_end, end)
+            for chunk_start in range(span_start, scan_end, SCAN_CHUNK_SIZE):
+                size = min(SCAN_CHUNK_SIZE + overlap, span_end - chunk_start)
+                try:
+                    yield chunk_start, self.read_bytes(chunk_start, size, 0)
+                except Exception:
+                    if regions is not None:
+                        continue
+                    # No memory map to go off, so salvage whatever pages are readable
+                    for page_start in range(chunk_start, chunk_start + size, SCAN_PAGE_SIZE):
+                        try:
+                            yield page_start, self.read_bytes(page_start, min(SCAN_PAGE_SIZE, chunk_start + size - page_start), 0)
+                        except Exception:
+                            continue
+
     def read_bytes(self, address: int, size: int, n64_addr: int) -> bytes:
         """Read bytes from process memory."""
         if IS_WINDOWS:
@@ -255,6 +381,7 @@ class ProcessMemory:
         buffer = ctypes.create_string_buffer(size)
         bytes_read = ctypes.wintypes.DWORD(0)
         
+        start = time.perf_counter_ns()
         result = ctypes.windll.kernel32.ReadProcessMemory(
             self.process_handle,
             ctypes.c_void_p(address),
@@ -262,6 +389,7 @@ class ProcessMemory:
             size,
             ctypes.byref(bytes_read)
         )
+        self.accounting.syscall(address, size, time.perf_counter_ns() - start, bool(result), None if result else f"error {ctypes.GetLastError()}")
         
         if not result:
             raise Exception(f"Failed to read memory at address 0x{address:08x} (N64: 0x{n64_addr:08x})")
@@ -272,16 +400,79 @@ class ProcessMemory:
         """Read bytes from process memory on Linux."""
         if not self.mem_file:
             raise Exception("Process not attached")
-        
+
+        if self.use_vm_readv:
+            buffer = bytearray(size)
+            if self._vm_readv([(address, size)], buffer):
+                return bytes(buffer)
+            if self.use_vm_readv:
+                raise Exception(f"Failed to read {size} bytes at address 0x{address:08x} (N64: 0x{n64_addr:08x})")
+
+        start = time.perf_counter_ns()
         try:
-            self.mem_file.seek(address)
-            data = self.mem_file.read(size)
+            # A seek and a read, two round trips
+            with self.file_lock:
+                self.mem_file.seek(address)
+                data = self.mem_file.read(size)
+            self.accounting.syscall(address, size, time.perf_counter_ns() - start, len(data) == size, None if len(data) == size else "short read", count=2)
             if len(data) != size:
                 raise Exception(f"Failed to read {size} bytes at address 0x{address:08x} (N64: 0x{n64_addr:08x})")
             return data
         except (OSError, IOError) as e:
+            self.accounting.syscall(address, size, time.perf_counter_ns() - start, False, str(e), count=2)
             raise Exception(f"Failed to read memory at address 0x{address:08x}: {e}")
     
+    def _vm_readv(self, reads: List[Tuple[int, int]], buffer: bytearray) -> bool:
+        """Fill a buffer from a list of (address, size) regions with process_vm_readv.
+
+        Returns False if any region could not be read. If the syscall itself is
+        unavailable (old kernel, ptrace restrictions), the /proc/pid/mem backend
+        is used from then on.
+        """
+        total = sum(size for _, size in reads)
+        if total == 0:
+            return True
+        base = ctypes.addressof((ctypes.c_char * len(buffer)).from_buffer(buffer))
+        local = (IOVEC * 1)(IOVEC(base, total))
+        done = 0
+        for i in range(0, len(reads), IOV_MAX):
+            chunk = reads[i:i + IOV_MAX]
+            remote = (IOVEC * len(chunk))(*(IOVEC(address, size) for address, size in chunk))
+            expected = sum(size for _, size in chunk)
+            local[0].iov_base = base + done
+            local[0].iov_len = expected
+            start = time.perf_counter_ns()
+            result = _process_vm_readv(self.process_id, local, 1, remote, len(chunk), 0)
+            elapsed = time.perf_counter_ns() - start
+            if result < 0:
+                err = ctypes.get_errno()
+                self.accounting.syscall(chunk[0][0], expected, elapsed, False, errno.errorcode.get(err, str(err)))
+                if err in (errno.ENOSYS, errno.EPERM):
+                    self.use_vm_readv = False
+                return False
+            self.accounting.syscall(chunk[0][0], expected, elapsed, result == expected, None if result == expected else f"short read of {result} bytes")
+            if result != expected:
+                return False
+            done += expected
+        return True
+
+    def read_scatter(self, reads: List[Tuple[int, int]]) -> bytearray:
+        """Read a list of (address, size) regions into one buffer, back to back.
+
+        On Linux this is a single process_vm_readv syscall where possible.
+        """
+        buffer = bytearray(sum(size for _, size in reads))
+        if IS_LINUX and self.use_vm_readv:
+            if self._vm_readv(reads, buffer):
+                return buffer
+            if self.use_vm_readv:
+                raise Exception(f"Failed to read {len(reads)} regions from process {self.process_name}")
+        offset = 0
+        for address, size in reads:
+            buffer[offset:offset + size] = self.read_bytes(address, size, 0)
+            offset += size
+        return buffer
+
     def read_int(self, address: int) -> int:
         """Read a 4-byte integer from memory."""
         data = self.read_bytes(address, 4, 0)
@@ -292,6 +483,31 @@ class ProcessMemory:
         data = self.read_bytes(address, 8, 0)
         return int.from_bytes(data, "little")
     
+    def start_time(self) -> Optional[int]:
+        """Get when the process started, to tell it apart from a later process reusing its PID."""
+        if IS_WINDOWS and self.process_handle:
+            creation = ctypes.wintypes.FILETIME()
+            exit_time = ctypes.wintypes.FILETIME()
+            kernel_time = ctypes.wintypes.FILETIME()
+            user_time = ctypes.wintypes.FILETIME()
+            if ctypes.windll.kernel32.GetProcessTimes(
+                self.process_handle,
+                ctypes.byref(creation),
+                ctypes.byref(exit_time),
+                ctypes.byref(kernel_time),
+                ctypes.byref(user_time)
+            ):
+                return (creation.dwHighDateTime << 32) | creation.dwLowDateTime
+        elif IS_LINUX and self.process_id:
+            try:
+                with open(f"/proc/{self.process_id}/stat", "r") as stat_file:
+                    # The process name can contain spaces, so split after it
+                    fields = stat_file.read().rsplit(")", 1)[1].split()
+                return int(fields[19])
+            except (OSError, IOError, IndexError, ValueError):
+                pass
+        return None
+
     def close(self):
         """Close the process handle or file."""
         if IS_WINDOWS and self.process_handle:
@@ -391,82 +607,257 @@ class EmulatorInfo:
         self.connected_process = None
 
     def raiseError(self, msg: str):
-        print(msg)
+        log.warning(msg)
         self.connection_error = msg
 
-    def attach_to_emulator(self) -> Optional[Tuple[ProcessMemory, int]]:
-        """Grab  memory addresses of where emulated RDRAM is."""
+    def attach_to_emulator(self, cancel: Optional[threading.Event] = None, processes: Optional[ProcessTable] = None) -> Optional[Tuple[ProcessMemory, int]]:
+        """Grab  memory addresses of where emulated RDRAM is.
+
+        Setting `cancel` from another thread abandons the scan and closes the process.
+        """
         # Reset
         self.connected_process = None
         self.connected_offset = None
         # Find process by name
-        target_proc = None
-        processes = get_running_processes()
-        
-        for proc in processes:
-            if proc["name"] and proc["name"].lower().startswith(self.process_name.lower()):
-                target_proc = proc
-                break
+        if processes is None:
+            processes = ProcessTable()
+        target_proc = processes.find(self.process_name)
         if not target_proc:
             self.raiseError(f"Could not find process '{self.process_name}'")
             return None
 
         try:
-            pm = ProcessMemory(target_proc["name"])
+            pm = processes.open(target_proc)
         except Exception as e:
             self.raiseError(f"Failed to attach to process: {str(e)}")
             return None
+
+        with pm.accounting.caller("attach_cache"):
+            cached_offset = self._check_attach_cache(pm)
+        if cached_offset is not None:
+            self.connected_process = pm
+            self.connected_offset = cached_offset
+            return (pm, cached_offset)
             
         address_dll = 0
         if self.find_dll:
-            possible_names = self.get_possible_library_names()
-            for module in pm.list_modules():
-                for lib_name in possible_names:
-                    if module.name.lower() == lib_name.lower():
-                        address_dll = module.lpBaseOfDll
-                        print(f"Found process for {self.readable_emulator_name}: {module.name.lower()}")
-                        break
-                if address_dll != 0:
-                    break
-
+            address_dll = self._find_module_base(pm)
             if address_dll == 0 and self.id == Emulators.BizHawk:
                 address_dll = 2024407040  # fallback guess
             elif address_dll == 0:
-                searched_names = ", ".join(possible_names)
+                searched_names = ", ".join(self.get_possible_library_names())
                 self.raiseError(f"Could not find any of [{searched_names}] in {self.readable_emulator_name}")
+                pm.close()
                 return None
 
-        has_seen_nonzero = False
-        for pot_off in range(self.lower_offset_range, self.upper_offset_range, self.range_step):
+        with pm.accounting.caller("attach_scan"):
             if self.additional_lookup:
-                rom_addr_start = address_dll + pot_off
-                try:
-                    read_address = pm.read_longlong(rom_addr_start)
-                except Exception:
-                    continue
-                if read_address != 0:
-                    has_seen_nonzero = True
+                rdram_address, has_seen_nonzero = self._scan_pointers(pm, address_dll, cancel)
             else:
-                read_address = address_dll + pot_off
-
-            addr = read_address + self.extra_offset + 0x759290
-
-            try:
-                test_value = pm.read_int(addr)
-            except Exception:
-                continue
-            if test_value != 0:
-                has_seen_nonzero = True
-            if test_value == 0x52414D42:
-                self.connected_process = pm
-                self.connected_offset = read_address + self.extra_offset
-                return (pm, read_address + self.extra_offset)
-
+                rdram_address, has_seen_nonzero = self._scan_signature(pm, address_dll, cancel)
+        if rdram_address is not None and not (cancel is not None and cancel.is_set()):
+            self.connected_process = pm
+            self.connected_offset = rdram_address
+            self._store_attach_cache(pm, address_dll, rdram_address)
+            return (pm, rdram_address)
+
+        pm.close()
+        if cancel is not None and cancel.is_set():
+            return None
         if not has_seen_nonzero:
             self.raiseError(f"Could not read any data from {self.readable_emulator_name}")
         
         return None
 
+    def _find_module_base(self, pm: ProcessMemory) -> int:
+        """Base address of the emulator core library in the process, or 0 if it isn't loaded."""
+        possible_names = [name.lower() for name in self.get_possible_library_names()]
+        for module in pm.list_modules():
+            if module.name.lower() in possible_names:
+                log.info(f"Found process for {self.readable_emulator_name}: {module.name.lower()}")
+                return module.lpBaseOfDll
+        return 0
+
+    def _check_attach_cache(self, pm: ProcessMemory) -> Optional[int]:
+        """Get the RDRAM offset from a previous scan of this exact process, if it still holds."""
+        entry = load_attach_cache().get(self.id.name)
+        if not entry or entry.get("pid") != pm.process_id or entry.get("start_time") != pm.start_time():
+            return None
+        # A core that was unloaded and reloaded (eg. RetroArch switching cores) moves RDRAM with it
+        if self.find_dll and self._find_module_base(pm) not in (0, entry.get("module_base")):
+            return None
+        try:
+            if pm.read_int(entry["offset"] + RAMB_OFFSET) != RAMB_SIGNATURE:
+                return None
+        except Exception:
+            return None
+        log.info(f"Reusing cached offset for {self.readable_emulator_name}")
+        return entry["offset"]
+
+    def _store_attach_cache(self, pm: ProcessMemory, address_dll: int, rdram_address: int):
+        """Remember where RDRAM was found for this process."""
+        start_time = pm.start_time()
+        if start_time is None:
+            return
+        with _attach_cache_lock:
+            cache = load_attach_cache()
+            cache[self.id.name] = {
+                "pid": pm.process_id,
+                "start_time": start_time,
+                "module_base": address_dll,
+                "offset": rdram_address,
+            }
+            try:
+                with open(f"{ATTACH_CACHE_JSON}.tmp", "w") as fh:
+                    json.dump(cache, fh, indent=4)
+                os.replace(f"{ATTACH_CACHE_JSON}.tmp", ATTACH_CACHE_JSON)
+            except OSError:
+                pass
+
+    def _scan_signature(self, pm: ProcessMemory, address_dll: int, cancel: Optional[threading.Event]) -> Tuple[Optional[int], bool]:
+        """Search the offset range directly for the RAMB signature."""
+        scan_start = address_dll + self.lower_offset_range + self.extra_offset + RAMB_OFFSET
+        scan_end = address_dll + self.upper_offset_range + self.extra_offset + RAMB_OFFSET
+        signature = struct.pack("<I", RAMB_SIGNATURE)
+        has_seen_nonzero = False
+        for chunk_start, data in pm.read_chunks(scan_start, scan_end, 3):
+            if cancel is not None and cancel.is_set():
+                break
+            if not has_seen_nonzero and data.strip(b"\0"):
+                has_seen_nonzero = True
+            limit = min(len(data) - 3, scan_end - chunk_start)
+            pos = data.find(signature, 0, limit + 3)
+            while 0 <= pos < limit:
+                if (chunk_start + pos - scan_start) % self.range_step == 0:
+                    return chunk_start + pos - RAMB_OFFSET, True
+                pos = data.find(signature, pos + 1, limit + 3)
+        return None, has_seen_nonzero
+
+    def _scan_pointers(self, pm: ProcessMemory, address_dll: int, cancel: Optional[threading.Event]) -> Tuple[Optional[int], bool]:
+        """Search the offset range for a pointer to RDRAM, verified by the RAMB signature."""
+        scan_start = address_dll + self.lower_offset_range
+        scan_end = address_dll + self.upper_offset_range
+        regions = pm.readable_regions()
+        region_starts = [start for start, _ in regions] if regions is not None else []
+        target_offset = self.extra_offset + RAMB_OFFSET
+        prefixes = self._pointer_prefixes(regions, target_offset) if regions is not None else None
+        has_seen_nonzero = False
+        for chunk_start, data in pm.read_chunks(scan_start, scan_end, 7):
+            if cancel is not None and cancel.is_set():
+                break
+            first = -(chunk_start - scan_start) % self.range_step
+            limit = min(len(data) - 7, scan_end - chunk_start)
+            if not has_seen_nonzero and data.strip(b"\0"):
+                has_seen_nonzero = True
+            if prefixes is not None:
+                # Only values which could point into mapped memory, found without unpacking the rest
+                offsets = self._prefixed_pointers(data, first, self.range_step, limit, prefixes)
+                pointers = set(offsets)
+                first_offset = offsets.__getitem__
+            else:
+                runs = self._strided_pointers(data, first, self.range_step, limit)
+                pointers = set().union(*(values for _, _, values in runs))
+                first_offset = lambda pointer, runs=runs: self._first_offset(runs, pointer)
+            pointers.discard(0)
+            # Only test pointers whose signature address is actually mapped
+            if regions is not None:
+                pointers = {
+                    pointer for pointer in pointers
+                    if self._is_readable(regions, region_starts, pointer + target_offset)
+                }
+            if not pointers:
+                continue
+            matches = [
+                pointer for pointer, value in self._read_targets(pm, sorted(pointers), target_offset)
+                if value == RAMB_SIGNATURE
+            ]
+            if not matches:
+                continue
+            # Several pointers may match, the first in the offset range wins
+            return min(matches, key=first_offset) + self.extra_offset, True
+        return None, has_seen_nonzero
+
+    @staticmethod
+    def _pointer_prefixes(regions: List[Tuple[int, int]], target_offset: int) -> Optional[List[bytes]]:
+        """Get the little-endian top bytes of every pointer whose target lands in a region.
+
+        The finest prefixes that number at most SCAN_PREFIX_LIMIT are used, or
+        None if even the coarsest are too many to search for one by one.
+        """
+        for shift in (24, 32, 40):
+            keys = set()
+            for start, end in regions:
+                low = max(0, start - target_offset) >> shift
+                high = max(0, end - 4 - target_offset) >> shift
+                if high - low + 1 + len(keys) > SCAN_PREFIX_LIMIT:
+                    break
+                keys.update(range(low, high + 1))
+            else:
+                return [key.to_bytes(8 - shift // 8, "little") for key in sorted(keys)]
+        return None
+
+    @staticmethod
+    def _prefixed_pointers(data: bytes, first: int, step: int, limit: int, prefixes: List[bytes]) -> Dict[int, int]:
+        """Get {value: first offset} for the u64s at first, first + step, ... below limit ending in a prefix."""
+        offsets = {}
+        for prefix in prefixes:
+            skip = 8 - len(prefix)
+            position = data.find(prefix, first + skip)
+            while position != -1:
+                offset = position - skip
+                if offset >= limit:
+                    break
+                if (offset - first) % step == 0:
+                    value = int.from_bytes(data[offset:offset + 8], "little")
+                    if offset < offsets.get(value, limit):
+                        offsets[value] = offset
+                position = data.find(prefix, position + 1)
+        return offsets
+
+    @staticmethod
+    def _strided_pointers(data: bytes, first: int, step: int, limit: int) -> List[Tuple[int, int, array.array]]:
+        """Unpack the u64s at first, first + step, ... below limit as (offset, stride, values) runs."""
+        stride = step * 8 // math.gcd(step, 8)
+        runs = []
+        for offset in range(first, first + stride, step):
+            if offset >= limit:
+                break
+            phase = offset % 8
+            values = array.array("Q")
+            values.frombytes(data[phase:phase + ((len(data) - phase) // 8) * 8])
+            if sys.byteorder == "big":
+                values.byteswap()
+            count = (limit - offset + stride - 1) // stride
+            runs.append((offset, stride, values[offset // 8::stride // 8][:count]))
+        return runs
+
+    @staticmethod
+    def _first_offset(runs: List[Tuple[int, int, array.array]], pointer: int) -> int:
+        """Get where a value first appears in runs from _strided_pointers."""
+        return min(offset + values.index(pointer) * stride for offset, stride, values in runs if pointer in values)
+
+    @staticmethod
+    def _is_readable(regions: List[Tuple[int, int]], region_starts: List[int], address: int) -> bool:
+        index = bisect.bisect_right(region_starts, address) - 1
+        return index >= 0 and address + 4 <= regions[index][1]
+
+    @staticmethod
+    def _read_targets(pm: ProcessMemory, pointers: List[int], target_offset: int):
+        """Yield (pointer, value) for the u32 at each pointer plus an offset, batching the reads."""
+        batch_size = 256
+        for i in range(0, len(pointers), batch_size):
+            batch = pointers[i:i + batch_size]
+            try:
+                data = pm.read_scatter([(pointer + target_offset, 4) for pointer in batch])
+                for j, pointer in enumerate(batch):
+                    yield pointer, int.from_bytes(data[j * 4:j * 4 + 4], "little")
+            except Exception:
+                for pointer in batch:
+                    try:
+                        yield pointer, pm.read_int(pointer + target_offset)
+                    except Exception:
+                        continue
+
     def readBytes(self, address: int, size: int) -> int:
         """Read a series of bytes and cast to an int."""
         if self.connected_process is None or self.connected_offset is None:
@@ -492,7 +883,18 @@ EMULATOR_CONFIGS = {
 }
 
 
-def attachWrapper(emu: Emulators) -> EmulatorInfo:
+def load_attach_cache() -> Dict[str, Dict[str, int]]:
+    """Load the offsets found by previous scans."""
+    if not os.path.exists(ATTACH_CACHE_JSON):
+        return {}
+    try:
+        with open(ATTACH_CACHE_JSON, "r") as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return {}
+
+
+def attachWrapper(emu: Emulators, cancel: Optional[threading.Event] = None, processes: Optional[ProcessTable] = None) -> EmulatorInfo:
     """Wrap function for attaching to an emulator."""
-    EMULATOR_CONFIGS[emu].attach_to_emulator()
+    EMULATOR_CONFIGS[emu].attach_to_emulator(cancel, processes)
     return EMULATOR_CONFIGS[emu]
@@ -0,0 +1,173 @@
+import bisect
+import collections
+import contextlib
+import threading
+import time
+
+LATENCY_BUCKETS_US = (10, 25, 50, 100, 250, 500, 1000, 2500, 10000)
+SIZE_BUCKETS = (1, 2, 4, 16, 64, 256, 1024, 4096, 0x10000, 0x100000)
+REGION_SIZE = 0x10000  # N64 reads are grouped by the 64 KiB region they start in
+FAILURE_LOG_SIZE = 32
+
+_caller = threading.local()
+
+def current_caller() -> str:
+    return getattr(_caller, "name", None) or "other"
+
+def _bucket_name(buckets, index, unit=""):
+    if index < len(buckets):
+        return f"<={buckets[index]}{unit}"
+    return f">{buckets[-1]}{unit}"
+
+class ReadAccounting:
+    """Counts every read made of one process's memory.
+
+    ProcessMemory records each kernel round trip (syscall) with its size,
+    latency and whether it failed. N64MemoryClient records each logical read
+    of RDRAM with its region, size and source (eg. the item type). Both are
+    attributed to the caller named on the current thread:
+
+        with accounting.caller("poll"):
+            ...
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.callers = {}
+            self.sources = collections.defaultdict(lambda: [0, 0])  # source -> [reads, bytes]
+            self.regions = collections.defaultdict(lambda: [0, 0])  # region -> [reads, bytes]
+            self.sizes = collections.Counter()
+            self.failures = collections.deque(maxlen=FAILURE_LOG_SIZE)
+            self.since = time.monotonic()
+
+    def _caller_stats(self, name: str) -> dict:
+        stats = self.callers.get(name)
+        if stats is None:
+            stats = self.callers[name] = {
+                "calls": 0,
+                "reads": 0,
+                "bytes": 0,
+                "syscalls": 0,
+                "syscall_bytes": 0,
+                "failed": 0,
+                "latency": [0] * (len(LATENCY_BUCKETS_US) + 1),
+                "latency_max_ns": 0,
+            }
+        return stats
+
+    @contextlib.contextmanager
+    def caller(self, name: str):
+        """Attribute reads on this thread to a caller, counting each use as one call."""
+        previous = getattr(_caller, "name", None)
+        _caller.name = name
+        with self.lock:
+            self._caller_stats(name)["calls"] += 1
+        try:
+            yield
+        finally:
+            _caller.name = previous
+
+    def syscall(self, address: int, size: int, elapsed_ns: int, ok: bool = True, error: str = None, count: int = 1):
+        """Record a kernel round trip (or `count` of them, sharing elapsed_ns) reading process memory.
+
+        Every syscall counts once towards the latency histogram and failures,
+        so they describe the same population as the syscall count.
+        """
+        name = current_caller()
+        per_syscall_ns = elapsed_ns // count
+        bucket = bisect.bisect_left(LATENCY_BUCKETS_US, per_syscall_ns / 1000)
+        with self.lock:
+            stats = self._caller_stats(name)
+            stats["syscalls"] += count
+            stats["syscall_bytes"] += size
+            stats["latency"][bucket] += count
+            stats["latency_max_ns"] = max(stats["latency_max_ns"], per_syscall_ns)
+            if not ok:
+                stats["failed"] += count
+                self.failures.append({
+                    "time": time.time(),
+                    "caller": name,
+                    "address": f"0x{address:X}",
+                    "size": size,
+                    "error": error,
+                })
+
+    def read(self, address: int, size: int, source: str = None):
+        """Record a logical read of RDRAM by N64 address."""
+        name = current_caller()
+        region = f"0x{(address | 0x80000000) & ~(REGION_SIZE - 1):08X}"
+        with self.lock:
+            stats = self._caller_stats(name)
+            stats["reads"] += 1
+            stats["bytes"] += size
+            source_stats = self.sources[source or name]
+            source_stats[0] += 1
+            source_stats[1] += size
+            region_stats = self.regions[region]
+            region_stats[0] += 1
+            region_stats[1] += size
+            self.sizes[bisect.bisect_left(SIZE_BUCKETS, size)] += 1
+
+    @staticmethod
+    def _latency(stats: dict) -> dict:
+        histogram = stats["latency"]
+        total = sum(histogram)
+        max_us = round(stats["latency_max_ns"] / 1000, 1)
+
+        def percentile(fraction):
+            # Upper bound of the bucket the percentile falls in
+            seen = 0
+            for index, count in enumerate(histogram):
+                seen += count
+                if count and seen >= total * fraction:
+                    return min(LATENCY_BUCKETS_US[index], max_us) if index < len(LATENCY_BUCKETS_US) else max_us
+            return None
+
+        return {
+            "p50_us": percentile(0.5),
+            "p99_us": percentile(0.99),
+            "max_us": max_us,
+            "histogram": {_bucket_name(LATENCY_BUCKETS_US, index, "us"): count for index, count in enumerate(histogram) if count},
+        }
+
+    def snapshot(self) -> dict:
+        """Everything counted since the last reset, as plain JSON-friendly data."""
+        with self.lock:
+            callers = {}
+            for name, stats in self.callers.items():
+                calls = stats["calls"]
+                callers[name] = {
+                    "calls": calls,
+                    "reads": stats["reads"],
+                    "bytes": stats["bytes"],
+                    "syscalls": stats["syscalls"],
+                    "syscall_bytes": stats["syscall_bytes"],
+                    "failed": stats["failed"],
+                    "syscalls_per_call": round(stats["syscalls"] / calls, 2) if calls else None,
+                    "bytes_per_call": round(stats["syscall_bytes"] / calls, 1) if calls else None,
+                    "latency": self._latency(stats),
+                }
+            return {
+                "seconds": round(time.monotonic() - self.since, 1),
+                "callers": callers,
+                "sources": {name: {"reads": reads, "bytes": size} for name, (reads, size) in self.sources.items()},
+                "regions": {name: {"reads": reads, "bytes": size} for name, (reads, size) in sorted(self.regions.items())},
+                "sizes": {_bucket_name(SIZE_BUCKETS, index): count for index, count in sorted(self.sizes.items())},
+                "failures": list(self.failures),
+            }
+
+    def describe(self) -> str:
+        """Summary for the debug panel."""
+        snapshot = self.snapshot()
+        lines = [f"Process reads, last {snapshot['seconds']}s"]
+        for name, stats in sorted(snapshot["callers"].items()):
+            latency = stats["latency"]
+            lines.append(
+                f"{name:<16} n={stats['calls']:<7} syscalls/call {stats['syscalls_per_call']}  bytes/call {stats['bytes_per_call']}"
+                f"  p50 <={latency['p50_us']}us  failed {stats['failed']}"
+            )
+        return "\n".join(lines)
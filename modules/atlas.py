@@ -0,0 +1,127 @@
+import time
+from PIL import Image, ImageEnhance
+
+ATLAS_SHEET_WIDTH = 1024
+
+class AtlasGeneration:
+    """A packed sheet of sprites at one scale, plus pre-dimmed copies of it."""
+
+    def __init__(self, scale, sheet, dimmed, boxes, build_time):
+        self.scale = scale
+        self.sheet = sheet
+        self.dimmed = dimmed  # dim factor -> dimmed sheet
+        self.boxes = boxes  # (path, size) -> box in sheet
+        self.build_time = build_time
+
+class SpriteAtlas:
+    """Every icon variant packed into one sheet at the current UI scale.
+
+    Source PNGs are decoded once and kept in memory, so building the sheet
+    for a new scale and slicing sprites out of it never touches the disk.
+    Building is split into prepare(), which only does PIL work and is safe
+    to run off the Tk thread, and apply(), which swaps the result in.
+    """
+
+    def __init__(self):
+        self.sources = {}  # path -> decoded RGBA image
+        self.generation = AtlasGeneration(None, None, {}, {}, 0.0)
+        self.load_time = 0.0
+
+    @property
+    def scale(self):
+        return self.generation.scale
+
+    def load(self, paths):
+        """Decode every source image which isn't already loaded."""
+        start = time.perf_counter()
+        for path in paths:
+            if path not in self.sources:
+                with Image.open(path) as img:
+                    self.sources[path] = img.convert("RGBA")
+        self.load_time += time.perf_counter() - start
+
+    def prepare(self, variants, scale, dim_factors=(0.5,)) -> AtlasGeneration:
+        """Pack each (path, size) variant into a fresh sheet, without touching the current one."""
+        start = time.perf_counter()
+        sheet, boxes = self.pack({
+            (path, size): self.resize(path, size)
+            for path, size in variants
+        })
+        dimmed = {
+            dim_factor: ImageEnhance.Brightness(sheet).enhance(dim_factor)
+            for dim_factor in dim_factors
+        }
+        return AtlasGeneration(scale, sheet, dimmed, boxes, time.perf_counter() - start)
+
+    def apply(self, generation: AtlasGeneration):
+        self.generation = generation
+
+    def build(self, variants, scale):
+        """Load, pack and swap in a sheet in one go."""
+        variants = list(variants)
+        self.load(path for path, _ in variants)
+        self.apply(self.prepare(variants, scale))
+
+    def resize(self, path, size):
+        img = self.sources[path]
+        if size:
+            img = img.resize(size, Image.LANCZOS)
+        return img
+
+    @staticmethod
+    def pack(sprites):
+        """Shelf pack sprites into one sheet, tallest first."""
+        boxes = {}
+        x = y = shelf_height = 0
+        order = sorted(sprites, key=lambda key: -sprites[key].height)
+        for key in order:
+            sprite = sprites[key]
+            if x + sprite.width > ATLAS_SHEET_WIDTH and x > 0:
+                x = 0
+                y += shelf_height
+                shelf_height = 0
+            boxes[key] = (x, y, x + sprite.width, y + sprite.height)
+            x += sprite.width
+            shelf_height = max(shelf_height, sprite.height)
+        width = max((box[2] for box in boxes.values()), default=1)
+        height = max((box[3] for box in boxes.values()), default=1)
+        sheet = Image.new("RGBA", (width, height))
+        for key, box in boxes.items():
+            sheet.paste(sprites[key], box[:2])
+        return sheet, boxes
+
+    def get(self, path, size):
+        """Get a copy of a sprite, falling back to resizing the in-memory source."""
+        generation = self.generation
+        box = generation.boxes.get((path, size))
+        if box is not None:
+            return generation.sheet.crop(box)
+        self.load([path])
+        return self.resize(path, size).copy()
+
+    def get_dimmed(self, path, size, dim_factor):
+        """Get a copy of a sprite dimmed by a factor."""
+        generation = self.generation
+        box = generation.boxes.get((path, size))
+        if box is not None and dim_factor in generation.dimmed:
+            return generation.dimmed[dim_factor].crop(box)
+        return ImageEnhance.Brightness(self.get(path, size)).enhance(dim_factor)
+
+    @property
+    def byte_count(self) -> int:
+        generation = self.generation
+        sheets = [generation.sheet, *generation.dimmed.values()] if generation.sheet else []
+        return (
+            sum(sheet.width * sheet.height * 4 for sheet in sheets)
+            + sum(img.width * img.height * 4 for img in self.sources.values())
+        )
+
+    def describe(self) -> str:
+        """Summarise the atlas, for measuring start up cost."""
+        generation = self.generation
+        width, height = generation.sheet.size if generation.sheet else (0, 0)
+        return (
+            f"{len(generation.boxes)} sprites from {len(self.sources)} files in a {width}x{height} sheet, "
+            f"{self.byte_count // 1024} KiB, loaded in {self.load_time * 1000:.1f}ms, "
+            f"built in {generation.build_time * 1000:.1f}ms"
+        )
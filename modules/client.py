@@ -1,5 +1,6 @@
-import struct
 from loader import EmulatorInfo
+from modules.accounting import ReadAccounting
+from modules.rdram import unswizzle, F32, U32
 
 # Wrapper for N64 memory operations with proper address translation
 class N64MemoryClient:
@@ -9,28 +10,71 @@ class N64MemoryClient:
     def read_u8(self, address):
         """Read an unsigned 8-bit value with N64 address fixing."""
         fixed_address = self._fix_n64_address(address, 1)
+        self.accounting.read(address, 1)
         data = self.emulator_info.connected_process.read_bytes(fixed_address, 1, address)
         return int.from_bytes(data, "little")
     
     def read_u16(self, address):
         """Read an unsigned 16-bit value with N64 address fixing."""
         fixed_address = self._fix_n64_address(address, 2)
+        self.accounting.read(address, 2)
         data = self.emulator_info.connected_process.read_bytes(fixed_address, 2, address)
         return int.from_bytes(data, "little")
     
     def read_u32(self, address):
         """Read an unsigned 32-bit value with N64 address fixing."""
         fixed_address = self._fix_n64_address(address, 4)
+        self.accounting.read(address, 4)
         data = self.emulator_info.connected_process.read_bytes(fixed_address, 4, address)
         return int.from_bytes(data, "little")
     
+    def read_block(self, address, size):
+        """Read a span of RDRAM in a single call, returned in N64 (big-endian) byte order."""
+        return self.read_blocks([(address, size)])[0]
+
+    def read_blocks(self, spans, sources=None):
+        """Read a list of (address, size) spans of RDRAM in as few process reads as possible.
+
+        `sources` optionally names what each span is read for, for the read accounting.
+        """
+        reads = []
+        heads = []
+        for address, size in spans:
+            start, end = self._word_span(address, size)
+            reads.append((self.emulator_info.connected_offset + start, end - start))
+            heads.append((address & 0x7FFFFFFF) - start)
+        for index, (address, size) in enumerate(spans):
+            self.accounting.read(address, size, sources[index] if sources else None)
+        data = unswizzle(self.emulator_info.connected_process.read_scatter(reads))
+        blocks = []
+        offset = 0
+        for (_, size), (_, read_size), head in zip(spans, reads, heads):
+            blocks.append(data[offset + head:offset + head + size])
+            offset += read_size
+        return blocks
+
     def read_f32(self, address):
         """Read a single-precision float with N64 address fixing."""
         value = self.read_u32(address)
         if value == 0:
             return 0
-        return struct.unpack("!f", bytes.fromhex("{:08X}".format(value)))[0]
-    
+        return F32.unpack(U32.pack(value))[0]
+
+    @property
+    def accounting(self) -> ReadAccounting:
+        """Read accounting for the connected process."""
+        return self.emulator_info.connected_process.accounting
+
+    def read_stats(self) -> dict:
+        """Every read made of the connected process so far, by caller, source, region and size."""
+        return self.accounting.snapshot()
+
+    def _word_span(self, address, size):
+        """Get the word-aligned RDRAM span covering an access."""
+        # RDRAM is stored as little-endian words, so reads have to cover whole words
+        address &= 0x7FFFFFFF
+        return address & ~3, (address + size + 3) & ~3
+
     def _fix_n64_address(self, address, size):
         """Fix N64 address for emulator compatibility - critical for memory operations."""
         # Apply N64 address fixing - strip MSB if set
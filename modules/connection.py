@@ -1,14 +1,20 @@
-import tkinter as tk
-from tkinter import ttk
-from loader import attachWrapper, Emulators
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from loader import attachWrapper, Emulators, ProcessTable
 from modules.client import N64MemoryClient
+from modules.items import build_read_plan
 from modules.memory_map import DK64MemoryMap
 from modules.lib import KrossbonesLib
+from modules.poller import ItemPoller, PollScheduler
+from modules.preferences import get_preference, set_preference
+from modules.recorder import SessionRecorder
+from modules.stats import STATS, STATS_JSON
 
-def connect_to_emulator():
+STATS_REFRESH_MS = 1000
+RECORDER_CLOSE_TIMEOUT = 2.0  # Seconds to wait on exit for the session file to be finished
+
+def connect_to_emulator(processes: ProcessTable = None):
     """Connect to any available emulator using the official loader system."""
-    # Try each emulator in order until one connects successfully
-    # Put Project64 4.0 before legacy since user mentioned PJ64 4.0 specifically
     emulator_order = [
         Emulators.RMG,                  # RMG
         Emulators.Project64_v4,         # Project64 4.0
@@ -20,28 +26,81 @@ def connect_to_emulator():
         Emulators.ParallelLauncher903,  # Parallel Launcher (9.0.3+)
     ]
     
-    for emulator in emulator_order:
+    # Probe every emulator at once, the first to find RDRAM wins and the rest are cancelled
+    cancel = threading.Event()
+    if processes is None:
+        processes = ProcessTable()
+    winner = None
+    with ThreadPoolExecutor(max_workers=len(emulator_order)) as pool:
+        futures = [pool.submit(attachWrapper, emulator, cancel, processes) for emulator in emulator_order]
+        for future in as_completed(futures):
+            try:
+                emulator_info = future.result()
+            except Exception:
+                # This emulator is not running or failed to connect, continue silently
+                continue
+            if winner is None and emulator_info and emulator_info.connected_process:
+                winner = emulator_info
+                cancel.set()
+
+    # Release anything else which managed to connect before being cancelled
+    for future in futures:
         try:
-            emulator_info = attachWrapper(emulator)
-            if emulator_info and hasattr(emulator_info, 'connected_process') and emulator_info.connected_process:
-                return emulator_info
+            emulator_info = future.result()
         except Exception:
-            # This emulator is not running or failed to connect, continue silently
             continue
+        if emulator_info is not winner and emulator_info.connected_process:
+            emulator_info.disconnect()
     
-    # No emulator found
-    return None
+    # No emulator found if there's no winner
+    return winner
 
 class KBConnection(KrossbonesLib):
     def __init__(self):
         self.memory_client = None
         self.memory_pointer = 0
+        self.process_table = None  # Processes to connect to instead of the running ones, used for replays
+        self.poller = None
+        self.recorder = None  # One session for as long as recording is on, carried across reconnects
+
+    def record_sessions(self) -> bool:
+        """Whether new pollers record the session."""
+        return get_preference("record_sessions")
+
+    def start_polling(self):
+        """Hand the memory client to a poller thread."""
+        self.stop_polling()
+        scheduler = PollScheduler(get_preference("min_poll_rate"), get_preference("max_poll_rate"))
+        if self.record_sessions():
+            if self.recorder is None:
+                self.recorder = SessionRecorder.in_folder([item.name for item in self.item_data], get_preference("session_compression"))
+        elif self.recorder is not None:
+            self.recorder.close()
+            self.recorder = None
+        # A plan of its own, a previous poller stuck in a read may still be using the last one
+        self.poller = ItemPoller(self.memory_client, build_read_plan(self.item_data), self.item_data, scheduler, self.recorder)
+        self.poller.start()
+
+    def stop_polling(self):
+        if self.poller is None:
+            return
+        self.poller.stop()
+        # Don't hang the UI if a read is stuck, the thread is a daemon
+        self.poller.join(timeout=0.5)
+        self.poller = None
+
+    def close_session(self):
+        """Stop polling and finish the session file, on the way out."""
+        self.stop_polling()
+        if self.recorder is not None:
+            self.recorder.close(RECORDER_CLOSE_TIMEOUT)
+            self.recorder = None
 
     def connect_internal(self):
         try:
             # Use the official loader to connect to any available emulator
             self.log_debug("Attempting to connect to any available emulator...")
-            emulator_info = connect_to_emulator()
+            emulator_info = connect_to_emulator(self.process_table)
             
             if emulator_info:
                 # Wrap the emulator connection with our N64 address fixing
@@ -53,7 +112,8 @@ class KBConnection(KrossbonesLib):
                 
                 # Test basic memory reading first
                 try:
-                    ramb_test = emulator_info.connected_process.read_bytes(emulator_info.connected_offset + 0x759290, 4, 0x80759290)
+                    with self.memory_client.accounting.caller("validation"):
+                        ramb_test = emulator_info.connected_process.read_bytes(emulator_info.connected_offset + 0x759290, 4, 0x80759290)
                     ramb_value = int.from_bytes(ramb_test, "little")
                     self.log_debug(f"RAMB signature test: 0x{ramb_value:08X}")
                     
@@ -69,21 +129,25 @@ class KBConnection(KrossbonesLib):
                 
                 # Try to validate connection with a simple read
                 try:
-                    memory_pointer = self.memory_client.read_u32(DK64MemoryMap.memory_pointer)
+                    with self.memory_client.accounting.caller("validation"):
+                        memory_pointer = self.memory_client.read_u32(DK64MemoryMap.memory_pointer)
                     self.log_debug(f"Memory pointer read successful: 0x{memory_pointer:08X}")
                     self.memory_pointer = memory_pointer
                     self.status_label.config(text=f"Connected to {emulator_info.readable_emulator_name}", foreground="green")
                     self.log_debug(f"Successfully connected to {emulator_info.readable_emulator_name}")
+                    self.start_polling()
                     self.frame_loop()
                 except Exception as validation_error:
                     self.log_debug(f"Memory pointer read failed: {str(validation_error)}")
                     
                     # Try basic map index read instead to verify connection works
                     try:
-                        map_index = self.memory_client.read_u32(DK64MemoryMap.map_index)
+                        with self.memory_client.accounting.caller("validation"):
+                            map_index = self.memory_client.read_u32(DK64MemoryMap.map_index)
                         self.log_debug(f"Basic connection test successful - Map index: {map_index}")
                         self.status_label.config(text=f"Connected to {emulator_info.readable_emulator_name}", foreground="green")
                         self.log_debug(f"Successfully connected to {emulator_info.readable_emulator_name} (basic mode)")
+                        self.start_polling()
                         self.frame_loop()
                     except Exception as basic_error:
                         self.log_debug(f"Basic connection test also failed: {str(basic_error)}")
@@ -103,6 +167,7 @@ class KBConnection(KrossbonesLib):
     
     def disconnect(self):
         """Disconnect from emulator."""
+        self.stop_polling()
         if self.memory_client:
             self.memory_client.close()
         self.memory_client = None
@@ -114,34 +179,36 @@ class KBConnection(KrossbonesLib):
         """Validate the connection."""
         if not self.memory_client:
             if self.debug_output:
+                import tkinter as tk
                 self.debug_output.insert(tk.END, "Not connected to emulator\n")
             return
         
         try:
-            self.log_debug("=== CONNECTION VALIDATION ===")
+            with self.memory_client.accounting.caller("validation"):
+                self.log_debug("=== CONNECTION VALIDATION ===")
             
-            # Test basic memory reading
-            test_addr = 0x807444E4  # Map index
-            try:
-                value = self.memory_client.read_u32(test_addr)
-                self.log_debug(f"Successfully read from 0x{test_addr:08X}: {value}")
-            except Exception as read_error:
-                self.log_debug(f"Failed to read from test address: {str(read_error)}")
+                # Test basic memory reading
+                test_addr = 0x807444E4  # Map index
+                try:
+                    value = self.memory_client.read_u32(test_addr)
+                    self.log_debug(f"Successfully read from 0x{test_addr:08X}: {value}")
+                except Exception as read_error:
+                    self.log_debug(f"Failed to read from test address: {str(read_error)}")
                 
-            # Test memory pointer
-            try:
-                memory_pointer = self.memory_client.read_u32(DK64MemoryMap.memory_pointer)
-                if memory_pointer != 0:
-                    self.log_debug(f"Memory pointer: 0x{memory_pointer:08X}")
+                # Test memory pointer
+                try:
+                    memory_pointer = self.memory_client.read_u32(DK64MemoryMap.memory_pointer)
+                    if memory_pointer != 0:
+                        self.log_debug(f"Memory pointer: 0x{memory_pointer:08X}")
                     
-                    # Try to read from memory pointer
-                    try:
-                        ptr_val = self.memory_client.read_u32(memory_pointer)
-                        self.log_debug(f"Value at memory pointer: 0x{ptr_val:08X}")
-                    except Exception as ptr_read_error:
-                        self.log_debug(f"Failed to read from memory pointer: {str(ptr_read_error)}")
-            except Exception as ptr_error:
-                self.log_debug(f"Memory pointer read failed: {str(ptr_error)}")
+                        # Try to read from memory pointer
+                        try:
+                            ptr_val = self.memory_client.read_u32(memory_pointer)
+                            self.log_debug(f"Value at memory pointer: 0x{ptr_val:08X}")
+                        except Exception as ptr_read_error:
+                            self.log_debug(f"Failed to read from memory pointer: {str(ptr_read_error)}")
+                except Exception as ptr_error:
+                    self.log_debug(f"Memory pointer read failed: {str(ptr_error)}")
                 
             self.log_debug("=== END VALIDATION ===")
                 
@@ -149,6 +216,10 @@ class KBConnection(KrossbonesLib):
             self.log_debug(f"Validation error: {str(e)}")
 
     def connection_ui(self, parent_frame):
+        # Tk is only imported by the UI, so the headless tracker never loads it
+        import tkinter as tk
+        from tkinter import ttk
+
         connection_frame = ttk.LabelFrame(parent_frame, text="Emulator Connection", padding="5")
         connection_frame.pack(fill=tk.X, pady=(0, 10))
         
@@ -161,9 +232,42 @@ class KBConnection(KrossbonesLib):
         self.status_label.pack(anchor=tk.W, pady=(5, 0))
 
     def debug_ui(self, parent_frame):
+        import tkinter as tk
+        from tkinter import ttk
+
         debug_frame = ttk.LabelFrame(parent_frame, text="Debug", padding="5")
         debug_frame.pack(fill=tk.X)
 
         # ── Output ───────────────────────────────────
         self.debug_output = tk.Text(debug_frame, height=6, width=60)
-        self.debug_output.pack(fill=tk.BOTH, expand=True, pady=(5, 0))
\ No newline at end of file
+        self.debug_output.pack(fill=tk.BOTH, expand=True, pady=(5, 0))
+
+        # ── Timing ───────────────────────────────────
+        stats_bar = ttk.Frame(debug_frame)
+        stats_bar.pack(fill=tk.X, pady=(5, 0))
+        self.collect_stats = tk.BooleanVar(value=STATS.enabled)
+        ttk.Checkbutton(stats_bar, text="Collect timings", variable=self.collect_stats, command=self.on_collect_stats).pack(side=tk.LEFT)
+        ttk.Button(stats_bar, text="Save JSON", command=self.save_stats).pack(side=tk.LEFT, padx=(5, 0))
+        self.stats_output = tk.Text(debug_frame, height=10, width=60, font="TkFixedFont", state=tk.DISABLED)
+        self.stats_output.pack(fill=tk.BOTH, expand=True, pady=(5, 0))
+        self.refresh_stats()
+
+    def on_collect_stats(self):
+        STATS.set_enabled(self.collect_stats.get())
+        set_preference("collect_stats", STATS.enabled)
+
+    def save_stats(self):
+        reads = {"reads": self.memory_client.read_stats()} if self.memory_client else None
+        STATS.dump(STATS_JSON, reads)
+        self.log_debug(f"Saved timings to {STATS_JSON}")
+
+    def refresh_stats(self):
+        import tkinter as tk
+
+        self.stats_output.config(state=tk.NORMAL)
+        self.stats_output.delete("1.0", tk.END)
+        self.stats_output.insert(tk.END, STATS.describe())
+        if self.memory_client:
+            self.stats_output.insert(tk.END, "\n" + self.memory_client.accounting.describe())
+        self.stats_output.config(state=tk.DISABLED)
+        self.root.after(STATS_REFRESH_MS, self.refresh_stats)
\ No newline at end of file
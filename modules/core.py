@@ -1,6 +1,8 @@
 from modules.client import N64MemoryClient
+from modules.read_plan import ReadPlan
 
 class KrossbonesCore:
     """Core functions that allow for better intellisense."""
     def __init__(self):
-        self.memory_client: N64MemoryClient = None
\ No newline at end of file
+        self.memory_client: N64MemoryClient = None
+        self.read_plan: ReadPlan = None
\ No newline at end of file
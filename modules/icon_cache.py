@@ -0,0 +1,34 @@
+from collections import OrderedDict
+
+ICON_CACHE_BUDGET = 32 * 1024 * 1024  # Bytes of decoded image data to keep around
+
+class IconCache:
+    """LRU cache of rendered icons, bounded by an estimate of the memory they hold."""
+
+    def __init__(self, budget: int = ICON_CACHE_BUDGET):
+        self.budget = budget
+        self.used = 0
+        self.entries = OrderedDict()  # key -> (rendered, cost)
+
+    def get(self, key, render, cost):
+        """Get a rendered icon, calling render() to build it on a miss.
+
+        cost(rendered) gives the size in bytes of what render() returned.
+        """
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+            return entry[0]
+        rendered = render()
+        size = cost(rendered)
+        self.entries[key] = (rendered, size)
+        self.used += size
+        # Always keep the newest entry, even if it alone is over budget
+        while self.used > self.budget and len(self.entries) > 1:
+            _, (_, evicted) = self.entries.popitem(last=False)
+            self.used -= evicted
+        return rendered
+
+    def clear(self):
+        self.entries.clear()
+        self.used = 0
@@ -1,84 +1,16 @@
 import tkinter as tk
 from tkinter import ttk
-from modules.memory_map import DK64MemoryMap
+from tkinter import font as tkfont
 from modules.lib import KrossbonesLib
 from modules.core import KrossbonesCore
-from enum import IntEnum, auto
-from typing import Union
-from PIL import Image, ImageTk, ImageEnhance, ImageFont, ImageDraw
+from modules.items import build_item_data, build_read_plan
+from modules.icon_cache import IconCache
+from modules.atlas import SpriteAtlas
+from modules.stats import STATS
+from PIL import ImageTk
 from modules.preferences import get_preference, set_preference
 from tkinter import colorchooser
-
-class ItemTypes(IntEnum):
-    CountStruct = auto()
-    KongBase = auto()
-    Flag = auto()
-
-class CountStructItem:
-    def __init__(self, offset: int, size: int, is_bitfield: bool, bit: int = 0):
-        self.offset = offset
-        self.is_bitfield = is_bitfield
-        self.size = size
-        self.bit = bit
-
-    def getCount(self, core: KrossbonesCore):
-        populated = core.memory_client.read_u8(DK64MemoryMap.count_struct_pointer) == 0x80
-        if not populated:
-            return 0
-        count_struct_loc = core.memory_client.read_u32(DK64MemoryMap.count_struct_pointer)
-        base = count_struct_loc + self.offset
-        val = 0
-        if self.size == 1:
-            val = core.memory_client.read_u8(base)
-        elif self.size == 2:
-            val = core.memory_client.read_u16(base)
-        elif self.size == 4:
-            val = core.memory_client.read_u32(base)
-        if self.is_bitfield:
-            val = (val >> self.bit) & 1
-        return val
-
-class KongBaseItem:
-    def __init__(self, kong: int, offset: int, size: int, is_bitfield: bool, bit: int = 0):
-        self.kong = kong
-        self.offset = offset
-        self.size = size
-        self.is_bitfield = is_bitfield
-        self.bit = bit
-
-    def getCount(self, core: KrossbonesCore):
-        base = 0x807FC950 + (0x5E * self.kong) + self.offset
-        val = 0
-        if self.size == 1:
-            val = core.memory_client.read_u8(base)
-        elif self.size == 2:
-            val = core.memory_client.read_u16(base)
-        elif self.size == 4:
-            val = core.memory_client.read_u32(base)
-        if self.is_bitfield:
-            val = (val >> self.bit) & 1
-        return val
-
-class FlagItem:
-    def __init__(self, flag_index: int):
-        self.flag_index = flag_index
-
-    def getCount(self, core: KrossbonesCore):
-        flag_offset = self.flag_index >> 3
-        flag_shift = self.flag_index & 7
-        val = core.memory_client.read_u8(0x807ECEA8 + flag_offset)
-        return (val >> flag_shift) & 1
-
-class Item:
-    def __init__(self, name: str, item_type: ItemTypes, packet: Union[CountStructItem, KongBaseItem, FlagItem]):
-        self.name = name
-        self.item_type = item_type
-        self.packet = packet
-        self.count = 0
-
-    def getCount(self, core: KrossbonesCore) -> int:
-        self.count = self.packet.getCount(core)
-        return self.count
+from concurrent.futures import ThreadPoolExecutor
 
 USE_COLOR_ICONS = True
 
@@ -105,28 +37,115 @@ class Icon:
             self.count = count
         self.is_compact = is_compact
 
+class CompiledIcon:
+    """An icon with its item dependencies resolved to indices.
+
+    The result of its conditions is remembered per state (the colour mode
+    plus the counts of the items it depends on), so each state only ever
+    runs the condition lambdas once.
+    """
+
+    def __init__(self, icon: Icon, deps: list[int]):
+        self.icon = icon
+        self.deps = deps
+        self.variants = {}  # state -> (winning IconCondition or None, count)
+
+    def resolve(self, counts: list[int]):
+        state = (USE_COLOR_ICONS, *[counts[index] for index in self.deps])
+        resolved = self.variants.get(state)
+        if resolved is None:
+            winner = None
+            for cond in self.icon.icon_data:
+                # Later conditions take priority over earlier ones
+                if cond.condition():
+                    winner = cond
+            count = self.icon.count() if self.icon.display_count else None
+            resolved = self.variants[state] = (winner, count)
+        return resolved
+
+class CountedCanvas:
+    """Passes calls through to a canvas, counting them as Tk calls."""
+
+    def __init__(self, canvas: tk.Canvas):
+        self.raw = canvas
+
+    def __getattr__(self, name):
+        method = getattr(self.raw, name)
+
+        def counted(*args, **kwargs):
+            STATS.count("tk_calls")
+            return method(*args, **kwargs)
+        return counted
+
 class CanvasImageLayer:
     def __init__(self, canvas: tk.Canvas):
         self.canvas = canvas
+        self.raw_canvas = canvas
         self.items = {}  # key -> image data
         self.state = {}
         self.stored_width = 0
         self.stored_height = 0
+        self.cache = IconCache()
+        self.atlas = SpriteAtlas()
+        self.fonts = {}  # pixel size -> count font
+        # Re-rasterizing for a new scale happens off the Tk thread, one generation per request
+        self.rasterizer = ThreadPoolExecutor(max_workers=1)
+        self.requested_scale = None
+        self.pending_scale = None  # (scale, future) of the newest request
+
+    def _render(self, image_path, size, dim_factor):
+        """Get the normal and dimmed images for an icon, rendering them on a cache miss."""
+        def render():
+            STATS.count("images_rebuilt")
+            img = self.atlas.get(image_path, size)
+            dimmed = self.atlas.get_dimmed(image_path, size, dim_factor)
+
+            return img, ImageTk.PhotoImage(img), ImageTk.PhotoImage(dimmed)
+
+        # RGBA source plus the two Tk copies
+        _, normal_tk, dimmed_tk = self.cache.get(
+            (image_path, size, dim_factor),
+            render,
+            lambda rendered: rendered[0].width * rendered[0].height * 4 * 3
+        )
+        return normal_tk, dimmed_tk
+
+    def instrument(self, enabled: bool):
+        """Count Tk calls while stats are being collected, and go straight to the canvas otherwise."""
+        if enabled != (self.canvas is not self.raw_canvas):
+            self.canvas = CountedCanvas(self.raw_canvas) if enabled else self.raw_canvas
+
+    def request_scale(self, variants, scale):
+        """Start rendering every variant at a new scale in the background."""
+        self.requested_scale = scale
+        if self.pending_scale is not None:
+            # Superseded before it started, so don't bother
+            self.pending_scale[1].cancel()
+        self.pending_scale = (scale, self.rasterizer.submit(self.atlas.prepare, list(variants), scale))
+
+    def apply_ready_scale(self) -> bool:
+        """Swap in the newest scale once it has fully rendered, returning whether it changed."""
+        if self.pending_scale is None:
+            return False
+        scale, future = self.pending_scale
+        if not future.done():
+            return False
+        self.pending_scale = None
+        if future.cancelled() or future.exception() is not None or scale != self.requested_scale:
+            return False
+        self.atlas.apply(future.result())
+        # Re-add all images
+        for state in self.state.values():
+            state["image"] = ""
+        return True
 
-    def add_image(self, key, image_path, x, y, dim_factor=0.5, size=None, has_number=False):
-        img = Image.open(image_path).convert("RGBA")
-
-        if size:
-            img = img.resize(size, Image.LANCZOS)
-
-        if has_number:
-            img = self._draw_number(img, 0)
-
-        # Create dimmed version
-        dimmed = ImageEnhance.Brightness(img).enhance(dim_factor)
+    def close(self):
+        """Stop the rasterizer, dropping any scale still waiting to render."""
+        self.pending_scale = None
+        self.rasterizer.shutdown(cancel_futures=True)
 
-        normal_tk = ImageTk.PhotoImage(img)
-        dimmed_tk = ImageTk.PhotoImage(dimmed)
+    def add_image(self, key, image_path, x, y, dim_factor=0.5, size=None, has_number=False):
+        normal_tk, dimmed_tk = self._render(image_path, size, dim_factor)
 
         canvas_id = self.canvas.create_image(
             x, y,
@@ -139,6 +158,8 @@ class CanvasImageLayer:
             "normal": normal_tk,
             "dimmed": dimmed_tk,
             "state": "normal",
+            "rect_id": None,
+            "text_id": None,
         }
         self.state[key] = {
             "dimmed": False,
@@ -151,30 +172,49 @@ class CanvasImageLayer:
             "dim_factor": dim_factor
         }
 
-    def _draw_number(self, img, number):
-        draw = ImageDraw.Draw(img)
-        font = ImageFont.truetype("assets/Roboto.ttf", max(12, int(img.width / 3)))
-
-        text = str(number)
-
-        # Use textbbox to get width and height
-        bbox = draw.textbbox((0, 0), text, font=font)
-        text_width = bbox[2] - bbox[0]
-        text_height = (bbox[3] - bbox[1]) + 5
-
+        if has_number:
+            # Count badge drawn over the icon, so count changes don't touch the image
+            self.items[key]["rect_id"] = self.canvas.create_rectangle(0, 0, 0, 0, fill="black", outline="")
+            self.items[key]["text_id"] = self.canvas.create_text(0, 0, text="0", fill="white", anchor="se")
+            self._place_number(key)
+
+    def _font(self, width):
+        """Get the count font for an icon width, shared between icons of the same size."""
+        font_size = max(12, int(width / 3))
+        if font_size not in self.fonts:
+            self.fonts[font_size] = tkfont.Font(family="Roboto", size=-font_size)
+        return self.fonts[font_size]
+
+    def _place_number(self, key):
+        """Position and size the count badge in the bottom right of its icon."""
+        item = self.items[key]
+        state = self.state[key]
+        if item["text_id"] is None:
+            return
+        if state["size"]:
+            width, height = state["size"]
+        else:
+            width, height = item["normal"].width(), item["normal"].height()
         padding = 2
-        x = img.width - text_width - padding
-        y = img.height - text_height - padding
+        self.canvas.itemconfig(item["text_id"], font=self._font(width))
+        self.canvas.coords(item["text_id"], state["x"] + width - padding, state["y"] + height - padding)
+        self._fit_number_background(key)
 
-        # Black background rectangle
-        draw.rectangle(
-            [x - 1, y - 1, x + text_width + 1, y + text_height + 1],
-            fill="black"
-        )
-        draw.text((x, y), text, font=font, fill="white")
-        return img
+    def _fit_number_background(self, key):
+        item = self.items[key]
+        bbox = self.canvas.bbox(item["text_id"])
+        if bbox:
+            self.canvas.coords(item["rect_id"], bbox[0] - 1, bbox[1] - 1, bbox[2] + 1, bbox[3] + 1)
 
+    def _show(self, key, normal_tk, dimmed_tk):
+        item = self.items[key]
+        item["normal"] = normal_tk
+        item["dimmed"] = dimmed_tk
 
+        self.canvas.itemconfig(
+            item["canvas_id"],
+            image=normal_tk if item["state"] == "normal" else dimmed_tk
+        )
     
     def set_number(self, key, number):
         """Update the number on an existing image."""
@@ -183,29 +223,11 @@ class CanvasImageLayer:
         if number == self.state[key]["number"]:
             return
         self.state[key]["number"] = number
-        image_path = self.state[key]["image"]
         item = self.items[key]
-
-        img = Image.open(image_path).convert("RGBA")
-        size = self.state[key]["size"]
-        if size:
-            img = img.resize(size, Image.LANCZOS)
-
-        img = self._draw_number(img, number)
-
-        dim_factor = self.state[key]["dim_factor"]
-        dimmed = ImageEnhance.Brightness(img).enhance(dim_factor)
-        normal_tk = ImageTk.PhotoImage(img)
-        dimmed_tk = ImageTk.PhotoImage(dimmed)
-
-        item["normal"] = normal_tk
-        item["dimmed"] = dimmed_tk
-        item["number"] = number
-
-        self.canvas.itemconfig(
-            item["canvas_id"],
-            image=normal_tk if item["state"] == "normal" else dimmed_tk
-        )
+        if item["text_id"] is None:
+            return
+        self.canvas.itemconfig(item["text_id"], text=str(number))
+        self._fit_number_background(key)
 
     def set_dimmed(self, key, dimmed: bool):
         if self.state[key]["dimmed"] == dimmed and not self.state[key]["force_dim_refresh"]:
@@ -219,6 +241,10 @@ class CanvasImageLayer:
             item["canvas_id"],
             image=item["dimmed"] if dimmed else item["normal"]
         )
+        if item["text_id"] is not None:
+            # Dim the count the same way as the icon
+            level = int(255 * self.state[key]["dim_factor"]) if dimmed else 255
+            self.canvas.itemconfig(item["text_id"], fill=f"#{level:02x}{level:02x}{level:02x}")
 
     def set_background(self, color):
         self.canvas.configure(bg=color)
@@ -232,39 +258,27 @@ class CanvasImageLayer:
         """Replace image but keep position + canvas ID"""
         if self.state[key]["image"] == new_image_path:
             return
+        resized = self.state[key]["size"] != size
         self.state[key]["image"] = new_image_path
         self.state[key]["force_dim_refresh"] = True  # Force dim change
-        img = Image.open(new_image_path).convert("RGBA")
-
-        if size:
-            img = img.resize(size, Image.LANCZOS)
-
-        if has_number:
-            img = self._draw_number(img, 0)
-
-        dimmed = ImageEnhance.Brightness(img).enhance(dim_factor)
-
-        normal_tk = ImageTk.PhotoImage(img)
-        dimmed_tk = ImageTk.PhotoImage(dimmed)
-
-        item = self.items[key]
-        item["normal"] = normal_tk
-        item["dimmed"] = dimmed_tk
-
-        self.canvas.itemconfig(
-            item["canvas_id"],
-            image=normal_tk if item["state"] == "normal" else dimmed_tk
-        )
+        self.state[key]["size"] = size
+        self.state[key]["dim_factor"] = dim_factor
+        self._show(key, *self._render(new_image_path, size, dim_factor))
+        if resized:
+            self._place_number(key)
 
     def set_position(self, key, x, y):
         """Set absolute position of an image on the canvas."""
-        if self.state[key]["x"] == x and self.state[key]["y"] == y:
-            return
         if key not in self.items:
             return
+        if self.state[key]["x"] == x and self.state[key]["y"] == y:
+            return
+        self.state[key]["x"] = x
+        self.state[key]["y"] = y
 
         canvas_id = self.items[key]["canvas_id"]
         self.canvas.coords(canvas_id, x, y)
+        self._place_number(key)
 
 
 class Controls(tk.Frame):
@@ -307,9 +321,6 @@ class Controls(tk.Frame):
         set_preference("ui_scale", self.ui_scale.get() * 20)
         ui_scale = get_preference("ui_scale")
         self.image_canvas.set_canvas_size(7 * ui_scale, 10 * ui_scale)
-        # Re-add all images
-        for v in self.image_canvas.state.values():
-            v["image"] = ""
 
     def on_toggle(self):
         global USE_COLOR_ICONS
@@ -332,88 +343,10 @@ class Inventory(KrossbonesCore, KrossbonesLib):
 
         self.layer = None
         self.items_frame = None
-        # Item database - separated into moves and items
-        self.item_data = [
-            # Kongs
-            Item("Donkey Kong", ItemTypes.CountStruct, CountStructItem(0xB, 1, True, 0)),
-            Item("Diddy Kong", ItemTypes.CountStruct, CountStructItem(0xB, 1, True, 1)),
-            Item("Lanky Kong", ItemTypes.CountStruct, CountStructItem(0xB, 1, True, 2)),
-            Item("Tiny Kong", ItemTypes.CountStruct, CountStructItem(0xB, 1, True, 3)),
-            Item("Chunky Kong", ItemTypes.CountStruct, CountStructItem(0xB, 1, True, 4)),
-            # All Kong Moves
-            Item("Barrel Throwing", ItemTypes.CountStruct, CountStructItem(0x18, 1, True, 5)),
-            Item("Orange Throwing", ItemTypes.CountStruct, CountStructItem(0x18, 1, True, 6)),
-            Item("Vine Swinging", ItemTypes.CountStruct, CountStructItem(0x18, 1, True, 4)),
-            Item("Diving", ItemTypes.CountStruct, CountStructItem(0x18, 1, True, 7)),
-            Item("Climbing", ItemTypes.Flag, FlagItem(0x29F)),
-            Item("Camera", ItemTypes.Flag, FlagItem(0x2FD)),
-            Item("Shockwave", ItemTypes.Flag, FlagItem(0x179)),
-            Item("Slam", ItemTypes.KongBase, KongBaseItem(0, 1, 1, False)),
-            Item("Homing", ItemTypes.KongBase, KongBaseItem(0, 2, 1, True, 1)),
-            Item("Sniper", ItemTypes.KongBase, KongBaseItem(0, 2, 1, True, 2)),
-            # Guns
-            Item("Coconut", ItemTypes.KongBase, KongBaseItem(0, 2, 1, True, 0)),
-            Item("Peanut", ItemTypes.KongBase, KongBaseItem(1, 2, 1, True, 0)),
-            Item("Grape", ItemTypes.KongBase, KongBaseItem(2, 2, 1, True, 0)),
-            Item("Feather", ItemTypes.KongBase, KongBaseItem(3, 2, 1, True, 0)),
-            Item("Pineapple", ItemTypes.KongBase, KongBaseItem(4, 2, 1, True, 0)),
-            # Instruments
-            Item("Bongos", ItemTypes.KongBase, KongBaseItem(0, 4, 1, True, 0)),
-            Item("Guitar", ItemTypes.KongBase, KongBaseItem(1, 4, 1, True, 0)),
-            Item("Trombone", ItemTypes.KongBase, KongBaseItem(2, 4, 1, True, 0)),
-            Item("Sax", ItemTypes.KongBase, KongBaseItem(3, 4, 1, True, 0)),
-            Item("Triangle", ItemTypes.KongBase, KongBaseItem(4, 4, 1, True, 0)),
-            # Special Moves
-            Item("Blast", ItemTypes.KongBase, KongBaseItem(0, 0, 1, True, 0)),
-            Item("Charge", ItemTypes.KongBase, KongBaseItem(1, 0, 1, True, 0)),
-            Item("Orangstand", ItemTypes.KongBase, KongBaseItem(2, 0, 1, True, 0)),
-            Item("Mini", ItemTypes.KongBase, KongBaseItem(3, 0, 1, True, 0)),
-            Item("Hunky", ItemTypes.KongBase, KongBaseItem(4, 0, 1, True, 0)),
-            Item("Strong", ItemTypes.KongBase, KongBaseItem(0, 0, 1, True, 1)),
-            Item("Rocket", ItemTypes.KongBase, KongBaseItem(1, 0, 1, True, 1)),
-            Item("Balloon", ItemTypes.KongBase, KongBaseItem(2, 0, 1, True, 1)),
-            Item("Twirl", ItemTypes.KongBase, KongBaseItem(3, 0, 1, True, 1)),
-            Item("Punch", ItemTypes.KongBase, KongBaseItem(4, 0, 1, True, 1)),
-            Item("Grab", ItemTypes.KongBase, KongBaseItem(0, 0, 1, True, 2)),
-            Item("Spring", ItemTypes.KongBase, KongBaseItem(1, 0, 1, True, 2)),
-            Item("Sprint", ItemTypes.KongBase, KongBaseItem(2, 0, 1, True, 2)),
-            Item("Port", ItemTypes.KongBase, KongBaseItem(3, 0, 1, True, 2)),
-            Item("Gone", ItemTypes.KongBase, KongBaseItem(4, 0, 1, True, 2)),
-            # Keys
-            Item("Key 1", ItemTypes.CountStruct, CountStructItem(0xA, 1, True, 0)),
-            Item("Key 2", ItemTypes.CountStruct, CountStructItem(0xA, 1, True, 1)),
-            Item("Key 3", ItemTypes.CountStruct, CountStructItem(0xA, 1, True, 2)),
-            Item("Key 4", ItemTypes.CountStruct, CountStructItem(0xA, 1, True, 3)),
-            Item("Key 5", ItemTypes.CountStruct, CountStructItem(0xA, 1, True, 4)),
-            Item("Key 6", ItemTypes.CountStruct, CountStructItem(0xA, 1, True, 5)),
-            Item("Key 7", ItemTypes.CountStruct, CountStructItem(0xA, 1, True, 6)),
-            Item("Key 8", ItemTypes.CountStruct, CountStructItem(0xA, 1, True, 7)),
-            # Blueprints
-            Item("DK Blueprints", ItemTypes.CountStruct, CountStructItem(0x0, 1, False)),
-            Item("Diddy Blueprints", ItemTypes.CountStruct, CountStructItem(0x1, 1, False)),
-            Item("Lanky Blueprints", ItemTypes.CountStruct, CountStructItem(0x2, 1, False)),
-            Item("Tiny Blueprints", ItemTypes.CountStruct, CountStructItem(0x3, 1, False)),
-            Item("Chunky Blueprints", ItemTypes.CountStruct, CountStructItem(0x4, 1, False)),
-            Item("DK Turn-Ins", ItemTypes.CountStruct, CountStructItem(0x19, 1, False)),
-            Item("Diddy Turn-Ins", ItemTypes.CountStruct, CountStructItem(0x1A, 1, False)),
-            Item("Lanky Turn-Ins", ItemTypes.CountStruct, CountStructItem(0x1B, 1, False)),
-            Item("Tiny Turn-Ins", ItemTypes.CountStruct, CountStructItem(0x1C, 1, False)),
-            Item("Chunky Turn-Ins", ItemTypes.CountStruct, CountStructItem(0x1D, 1, False)),
-            # Shopkeepers
-            Item("Cranky", ItemTypes.Flag, FlagItem(0x3C2)),
-            Item("Funky", ItemTypes.Flag, FlagItem(0x3C3)),
-            Item("Candy", ItemTypes.Flag, FlagItem(0x3C4)),
-            Item("Snide", ItemTypes.Flag, FlagItem(0x3C5)),
-            # Items
-            Item("Bean", ItemTypes.CountStruct, CountStructItem(0xD, 1, True, 5)),
-            Item("Nintendo Coin", ItemTypes.CountStruct, CountStructItem(0xD, 1, True, 7)),
-            Item("Rareware Coin", ItemTypes.CountStruct, CountStructItem(0xD, 1, True, 6)),
-            Item("Crowns", ItemTypes.CountStruct, CountStructItem(0xC, 1, False)),
-            Item("Medals", ItemTypes.CountStruct, CountStructItem(0xE, 1, False)),
-            Item("Pearls", ItemTypes.CountStruct, CountStructItem(0xF, 1, False)),
-            Item("Fairies", ItemTypes.CountStruct, CountStructItem(0x10, 1, False)),
-            Item("Rainbow Coins", ItemTypes.CountStruct, CountStructItem(0x11, 1, False)),
-        ]
+        self.poller = None
+        self.last_poll_error = None
+        self.item_data = build_item_data()
+        self.read_plan = build_read_plan(self.item_data)
 
         self.icons = [
             Icon("Donkey Kong", 0, 0, [
@@ -687,12 +620,58 @@ class Inventory(KrossbonesCore, KrossbonesLib):
             ], True, lambda: self.getCount("Rainbow Coins")),
         ]
 
-    def getCount(self, check) -> int:
-        for item in self.item_data:
-            if item.name == check:
-                return item.count
-        raise Exception("Invalid key")
+        self.item_index = {item.name: index for index, item in enumerate(self.item_data)}
+        self.counts = [0] * len(self.item_data)
+        self.dependency_trace = None
+        self.compiled_icons = [
+            CompiledIcon(icon, self.trace_dependencies(icon))
+            for icon in self.icons
+        ]
+        # Item index -> indices of the compiled icons which read it
+        self.icon_dependents = [[] for _ in self.item_data]
+        for icon_index, compiled in enumerate(self.compiled_icons):
+            for item_index in compiled.deps:
+                self.icon_dependents[item_index].append(icon_index)
+        self.dirty_icons = set(range(len(self.compiled_icons)))
+        self.shown_color_mode = None
 
+    def getCount(self, check) -> int:
+        index = self.item_index.get(check)
+        if index is None:
+            raise Exception("Invalid key")
+        if self.dependency_trace is not None:
+            self.dependency_trace.add(index)
+        return self.counts[index]
+
+    def trace_dependencies(self, icon: Icon) -> list[int]:
+        """Find which items an icon's conditions and count read."""
+        self.dependency_trace = set()
+        saved_counts = self.counts
+        # Evaluate with everything unset and everything set, so both sides of any short circuit get read
+        for probe in (0, 1):
+            self.counts = [probe] * len(self.item_data)
+            for cond in icon.icon_data:
+                cond.condition()
+            icon.count()
+        self.counts = saved_counts
+        deps = sorted(self.dependency_trace)
+        self.dependency_trace = None
+        return deps
+
+
+    def icon_size(self, icon: Icon, local_scale: float) -> tuple[int, int]:
+        dim = local_scale
+        if icon.is_compact:
+            dim *= 0.8
+        return (int(dim), int(dim))
+
+    def icon_variants(self, local_scale: float) -> set[tuple[str, tuple[int, int]]]:
+        """Get every image any icon can show at a scale."""
+        return {
+            (cond.icon, self.icon_size(icon, local_scale))
+            for icon in self.icons
+            for cond in icon.icon_data
+        }
 
     def items_ui(self, parent_frame):
         self.items_frame = ttk.Frame(parent_frame, padding="5")
@@ -706,17 +685,16 @@ class Inventory(KrossbonesCore, KrossbonesLib):
         self.layer = CanvasImageLayer(canvas)
         controls.image_canvas = self.layer
         local_scale = get_preference("ui_scale")
+        self.layer.atlas.build(self.icon_variants(local_scale), local_scale)
+        self.layer.requested_scale = local_scale
         
         for icon in self.icons:
-            dim = local_scale
-            if icon.is_compact:
-                dim *= 0.8
             self.layer.add_image(
                 key=icon.key,
                 image_path=icon.icon_data[0].icon,
                 x=int(local_scale * icon.x),
                 y=int(local_scale * icon.y),
-                size=(int(dim), int(dim)),
+                size=self.icon_size(icon, local_scale),
                 has_number=icon.display_count
             )
         controls.on_scale(True)
@@ -734,20 +712,46 @@ class Inventory(KrossbonesCore, KrossbonesLib):
     def update_items_ui(self):
         if self.layer is None or self.item_data is None or self.icons is None:
             return
-        mode_1 = self.memory_client.read_u8(0x80755318)
-        if mode_1 == 6:
-            for item in self.item_data:
-                item.getCount(self)
+        self.layer.instrument(STATS.enabled)
+        snapshot = self.poller.latest() if self.poller else None
+        if snapshot is not None:
+            if snapshot.error != self.last_poll_error:
+                self.last_poll_error = snapshot.error
+                if snapshot.error:
+                    self.log_debug(f"Memory read failed: {snapshot.error}")
+            for index, count in enumerate(snapshot.counts):
+                if count != self.counts[index]:
+                    self.counts[index] = count
+                    self.item_data[index].count = count
+                    self.dirty_icons.update(self.icon_dependents[index])
+        if self.shown_color_mode != USE_COLOR_ICONS:
+            self.shown_color_mode = USE_COLOR_ICONS
+            self.dirty_icons.update(range(len(self.compiled_icons)))
         local_scale = get_preference("ui_scale")
-        for icon in self.icons:
-            dim = local_scale
-            if icon.is_compact:
-                dim *= 0.8
-            for cond in icon.icon_data:
-                if cond.condition():
-                    self.layer.swap_image(icon.key, cond.icon, 0.5, (int(dim), int(dim)), icon.display_count)
-                    self.layer.set_position(icon.key, int(icon.x * local_scale), int(icon.y * local_scale))
-                    self.layer.set_dimmed(icon.key, cond.dim_if_true)
+        if self.layer.requested_scale != local_scale:
+            self.layer.request_scale(self.icon_variants(local_scale), local_scale)
+        if self.layer.apply_ready_scale():
+            self.dirty_icons.update(range(len(self.compiled_icons)))
+        if not self.dirty_icons:
+            return
+        dirty_icons = self.dirty_icons
+        self.dirty_icons = set()
+        self.redraw_icons(dirty_icons)
+
+    def redraw_icons(self, icon_indices):
+        """Resolve and draw the given icons."""
+        # Lay out at whichever scale has finished rendering
+        local_scale = self.layer.atlas.scale
+        start = STATS.start()
+        compiled_icons = [self.compiled_icons[icon_index] for icon_index in sorted(icon_indices)]
+        resolved = [(compiled.icon, *compiled.resolve(self.counts)) for compiled in compiled_icons]
+        STATS.stop("condition_eval", start)
+        start = STATS.start()
+        for icon, cond, count in resolved:
+            if cond is not None:
+                self.layer.swap_image(icon.key, cond.icon, 0.5, self.icon_size(icon, local_scale), icon.display_count)
+                self.layer.set_position(icon.key, int(icon.x * local_scale), int(icon.y * local_scale))
+                self.layer.set_dimmed(icon.key, cond.dim_if_true)
             if icon.display_count:
-                count = icon.count()
                 self.layer.set_number(icon.key, count)
+        STATS.stop("canvas_update", start)
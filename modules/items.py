@@ -0,0 +1,162 @@
+from enum import IntEnum, auto
+from typing import Union
+from modules.memory_map import DK64MemoryMap
+from modules.core import KrossbonesCore
+from modules.read_plan import ReadPlan
+
+READ_PLAN_GAP_TOLERANCE = 0x100  # Bytes of unused memory worth reading to save a read
+
+class ItemTypes(IntEnum):
+    CountStruct = auto()
+    KongBase = auto()
+    Flag = auto()
+
+class CountStructItem:
+    def __init__(self, offset: int, size: int, is_bitfield: bool, bit: int = 0):
+        self.offset = offset
+        self.is_bitfield = is_bitfield
+        self.size = size
+        self.bit = bit
+        self.slot = None
+
+    def register(self, plan: ReadPlan):
+        self.slot = plan.add(self.offset, self.size, DK64MemoryMap.count_struct_pointer, source=ItemTypes.CountStruct.name)
+
+    def getCount(self, core: KrossbonesCore):
+        val = core.read_plan.value(self.slot)
+        if self.is_bitfield:
+            val = (val >> self.bit) & 1
+        return val
+
+class KongBaseItem:
+    def __init__(self, kong: int, offset: int, size: int, is_bitfield: bool, bit: int = 0):
+        self.kong = kong
+        self.offset = offset
+        self.size = size
+        self.is_bitfield = is_bitfield
+        self.bit = bit
+        self.slot = None
+
+    def register(self, plan: ReadPlan):
+        self.slot = plan.add(0x807FC950 + (0x5E * self.kong) + self.offset, self.size, source=ItemTypes.KongBase.name)
+
+    def getCount(self, core: KrossbonesCore):
+        val = core.read_plan.value(self.slot)
+        if self.is_bitfield:
+            val = (val >> self.bit) & 1
+        return val
+
+class FlagItem:
+    def __init__(self, flag_index: int):
+        self.flag_index = flag_index
+        self.slot = None
+
+    def register(self, plan: ReadPlan):
+        self.slot = plan.add(0x807ECEA8 + (self.flag_index >> 3), 1, source=ItemTypes.Flag.name)
+
+    def getCount(self, core: KrossbonesCore):
+        val = core.read_plan.value(self.slot)
+        return (val >> (self.flag_index & 7)) & 1
+
+class Item:
+    def __init__(self, name: str, item_type: ItemTypes, packet: Union[CountStructItem, KongBaseItem, FlagItem]):
+        self.name = name
+        self.item_type = item_type
+        self.packet = packet
+        self.count = 0
+
+    def getCount(self, core: KrossbonesCore) -> int:
+        self.count = self.packet.getCount(core)
+        return self.count
+
+def build_item_data() -> list[Item]:
+    """Item database - separated into moves and items."""
+    return [
+        # Kongs
+        Item("Donkey Kong", ItemTypes.CountStruct, CountStructItem(0xB, 1, True, 0)),
+        Item("Diddy Kong", ItemTypes.CountStruct, CountStructItem(0xB, 1, True, 1)),
+        Item("Lanky Kong", ItemTypes.CountStruct, CountStructItem(0xB, 1, True, 2)),
+        Item("Tiny Kong", ItemTypes.CountStruct, CountStructItem(0xB, 1, True, 3)),
+        Item("Chunky Kong", ItemTypes.CountStruct, CountStructItem(0xB, 1, True, 4)),
+        # All Kong Moves
+        Item("Barrel Throwing", ItemTypes.CountStruct, CountStructItem(0x18, 1, True, 5)),
+        Item("Orange Throwing", ItemTypes.CountStruct, CountStructItem(0x18, 1, True, 6)),
+        Item("Vine Swinging", ItemTypes.CountStruct, CountStructItem(0x18, 1, True, 4)),
+        Item("Diving", ItemTypes.CountStruct, CountStructItem(0x18, 1, True, 7)),
+        Item("Climbing", ItemTypes.Flag, FlagItem(0x29F)),
+        Item("Camera", ItemTypes.Flag, FlagItem(0x2FD)),
+        Item("Shockwave", ItemTypes.Flag, FlagItem(0x179)),
+        Item("Slam", ItemTypes.KongBase, KongBaseItem(0, 1, 1, False)),
+        Item("Homing", ItemTypes.KongBase, KongBaseItem(0, 2, 1, True, 1)),
+        Item("Sniper", ItemTypes.KongBase, KongBaseItem(0, 2, 1, True, 2)),
+        # Guns
+        Item("Coconut", ItemTypes.KongBase, KongBaseItem(0, 2, 1, True, 0)),
+        Item("Peanut", ItemTypes.KongBase, KongBaseItem(1, 2, 1, True, 0)),
+        Item("Grape", ItemTypes.KongBase, KongBaseItem(2, 2, 1, True, 0)),
+        Item("Feather", ItemTypes.KongBase, KongBaseItem(3, 2, 1, True, 0)),
+        Item("Pineapple", ItemTypes.KongBase, KongBaseItem(4, 2, 1, True, 0)),
+        # Instruments
+        Item("Bongos", ItemTypes.KongBase, KongBaseItem(0, 4, 1, True, 0)),
+        Item("Guitar", ItemTypes.KongBase, KongBaseItem(1, 4, 1, True, 0)),
+        Item("Trombone", ItemTypes.KongBase, KongBaseItem(2, 4, 1, True, 0)),
+        Item("Sax", ItemTypes.KongBase, KongBaseItem(3, 4, 1, True, 0)),
+        Item("Triangle", ItemTypes.KongBase, KongBaseItem(4, 4, 1, True, 0)),
+        # Special Moves
+        Item("Blast", ItemTypes.KongBase, KongBaseItem(0, 0, 1, True, 0)),
+        Item("Charge", ItemTypes.KongBase, KongBaseItem(1, 0, 1, True, 0)),
+        Item("Orangstand", ItemTypes.KongBase, KongBaseItem(2, 0, 1, True, 0)),
+        Item("Mini", ItemTypes.KongBase, KongBaseItem(3, 0, 1, True, 0)),
+        Item("Hunky", ItemTypes.KongBase, KongBaseItem(4, 0, 1, True, 0)),
+        Item("Strong", ItemTypes.KongBase, KongBaseItem(0, 0, 1, True, 1)),
+        Item("Rocket", ItemTypes.KongBase, KongBaseItem(1, 0, 1, True, 1)),
+        Item("Balloon", ItemTypes.KongBase, KongBaseItem(2, 0, 1, True, 1)),
+        Item("Twirl", ItemTypes.KongBase, KongBaseItem(3, 0, 1, True, 1)),
+        Item("Punch", ItemTypes.KongBase, KongBaseItem(4, 0, 1, True, 1)),
+        Item("Grab", ItemTypes.KongBase, KongBaseItem(0, 0, 1, True, 2)),
+        Item("Spring", ItemTypes.KongBase, KongBaseItem(1, 0, 1, True, 2)),
+        Item("Sprint", ItemTypes.KongBase, KongBaseItem(2, 0, 1, True, 2)),
+        Item("Port", ItemTypes.KongBase, KongBaseItem(3, 0, 1, True, 2)),
+        Item("Gone", ItemTypes.KongBase, KongBaseItem(4, 0, 1, True, 2)),
+        # Keys
+        Item("Key 1", ItemTypes.CountStruct, CountStructItem(0xA, 1, True, 0)),
+        Item("Key 2", ItemTypes.CountStruct, CountStructItem(0xA, 1, True, 1)),
+        Item("Key 3", ItemTypes.CountStruct, CountStructItem(0xA, 1, True, 2)),
+        Item("Key 4", ItemTypes.CountStruct, CountStructItem(0xA, 1, True, 3)),
+        Item("Key 5", ItemTypes.CountStruct, CountStructItem(0xA, 1, True, 4)),
+        Item("Key 6", ItemTypes.CountStruct, CountStructItem(0xA, 1, True, 5)),
+        Item("Key 7", ItemTypes.CountStruct, CountStructItem(0xA, 1, True, 6)),
+        Item("Key 8", ItemTypes.CountStruct, CountStructItem(0xA, 1, True, 7)),
+        # Blueprints
+        Item("DK Blueprints", ItemTypes.CountStruct, CountStructItem(0x0, 1, False)),
+        Item("Diddy Blueprints", ItemTypes.CountStruct, CountStructItem(0x1, 1, False)),
+        Item("Lanky Blueprints", ItemTypes.CountStruct, CountStructItem(0x2, 1, False)),
+        Item("Tiny Blueprints", ItemTypes.CountStruct, CountStructItem(0x3, 1, False)),
+        Item("Chunky Blueprints", ItemTypes.CountStruct, CountStructItem(0x4, 1, False)),
+        Item("DK Turn-Ins", ItemTypes.CountStruct, CountStructItem(0x19, 1, False)),
+        Item("Diddy Turn-Ins", ItemTypes.CountStruct, CountStructItem(0x1A, 1, False)),
+        Item("Lanky Turn-Ins", ItemTypes.CountStruct, CountStructItem(0x1B, 1, False)),
+        Item("Tiny Turn-Ins", ItemTypes.CountStruct, CountStructItem(0x1C, 1, False)),
+        Item("Chunky Turn-Ins", ItemTypes.CountStruct, CountStructItem(0x1D, 1, False)),
+        # Shopkeepers
+        Item("Cranky", ItemTypes.Flag, FlagItem(0x3C2)),
+        Item("Funky", ItemTypes.Flag, FlagItem(0x3C3)),
+        Item("Candy", ItemTypes.Flag, FlagItem(0x3C4)),
+        Item("Snide", ItemTypes.Flag, FlagItem(0x3C5)),
+        # Items
+        Item("Bean", ItemTypes.CountStruct, CountStructItem(0xD, 1, True, 5)),
+        Item("Nintendo Coin", ItemTypes.CountStruct, CountStructItem(0xD, 1, True, 7)),
+        Item("Rareware Coin", ItemTypes.CountStruct, CountStructItem(0xD, 1, True, 6)),
+        Item("Crowns", ItemTypes.CountStruct, CountStructItem(0xC, 1, False)),
+        Item("Medals", ItemTypes.CountStruct, CountStructItem(0xE, 1, False)),
+        Item("Pearls", ItemTypes.CountStruct, CountStructItem(0xF, 1, False)),
+        Item("Fairies", ItemTypes.CountStruct, CountStructItem(0x10, 1, False)),
+        Item("Rainbow Coins", ItemTypes.CountStruct, CountStructItem(0x11, 1, False)),
+    ]
+
+def build_read_plan(item_data: list[Item]) -> ReadPlan:
+    """Register every item's read and merge them into as few reads as possible."""
+    plan = ReadPlan(READ_PLAN_GAP_TOLERANCE)
+    for item in item_data:
+        item.packet.register(plan)
+    plan.compile()
+    return plan
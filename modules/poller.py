@@ -0,0 +1,131 @@
+import queue
+import threading
+import time
+from typing import NamedTuple, Optional
+from modules.read_plan import ReadPlan
+from modules.memory_map import DK64MemoryMap
+from modules.stats import STATS
+
+GAMEPLAY_MODE = 6
+MODE_ADDRESS = 0x80755318
+
+class ItemSnapshot(NamedTuple):
+    """Item counts at one point in time, safe to hand between threads."""
+    counts: tuple
+    in_game: bool
+    map_index: int
+    time: float
+    error: Optional[str] = None
+
+class PollScheduler:
+    """Picks the delay before the next poll from what the game is doing.
+
+    Outside of gameplay the poller drops straight to the slowest rate. In
+    gameplay it runs at the fastest rate for a short burst after anything
+    changes (an item, the map or the game mode), then settles at the base
+    rate, and halves its rate for every further quiet period.
+    """
+
+    def __init__(self, min_rate: float = 1, max_rate: float = 20, base_rate: float = 10, burst: float = 2.0, quiet: float = 10.0):
+        self.min_interval = 1 / min_rate
+        self.max_interval = 1 / max_rate
+        self.base_interval = min(max(1 / base_rate, self.max_interval), self.min_interval)
+        self.burst = burst
+        self.quiet = quiet
+        self.last_change = time.monotonic()
+
+    def next_interval(self, in_game: bool, changed: bool, now: float) -> float:
+        if changed:
+            self.last_change = now
+        if not in_game:
+            return self.min_interval
+        idle = now - self.last_change
+        if idle < self.burst:
+            return self.max_interval
+        backoff = 2 ** int((idle - self.burst) // self.quiet)
+        return min(self.base_interval * backoff, self.min_interval)
+
+class ItemPoller(threading.Thread):
+    """Reads item state on its own thread, so slow reads never block the UI.
+
+    The poller is the only user of its read plan, so give each one its own:
+    a poller abandoned mid-read may still be refreshing the last one. The
+    memory client keeps no state between reads and can be shared.
+    The UI only ever sees the newest snapshot, older ones are dropped.
+    Snapshots that changed something also go to the recorder, if there is
+    one. The recorder outlives the poller, whoever made it closes it.
+    """
+
+    def __init__(self, memory_client, read_plan: ReadPlan, item_data: list, scheduler: Optional[PollScheduler] = None, recorder=None):
+        super().__init__(name="ItemPoller", daemon=True)
+        self.memory_client = memory_client
+        self.read_plan = read_plan
+        self.item_data = item_data
+        self.scheduler = scheduler if scheduler is not None else PollScheduler()
+        self.recorder = recorder
+        self.snapshots = queue.Queue(maxsize=1)
+        self.stopping = threading.Event()
+        self.counts = tuple(item.count for item in item_data)
+        self.in_game = False
+        self.map_index = -1
+
+    def poll(self) -> ItemSnapshot:
+        """Read every item once."""
+        with self.memory_client.accounting.caller("poll"):
+            return self._poll()
+
+    def _poll(self) -> ItemSnapshot:
+        start = STATS.start()
+        mode, map_index = self.memory_client.read_blocks([(MODE_ADDRESS, 1), (DK64MemoryMap.map_index, 4)], ["GameState", "GameState"])
+        in_game = mode[0] == GAMEPLAY_MODE
+        counts = self.counts
+        if in_game:
+            self.read_plan.refresh(self.memory_client)
+            STATS.stop("memory_read", start)
+            start = STATS.start()
+            # Packets read from self.read_plan, leaving the UI's Item objects alone
+            counts = tuple(item.packet.getCount(self) for item in self.item_data)
+            STATS.stop("item_decode", start)
+        else:
+            STATS.stop("memory_read", start)
+        self.counts = counts
+        self.in_game = in_game
+        self.map_index = int.from_bytes(map_index, "big")
+        return ItemSnapshot(counts, in_game, self.map_index, time.monotonic())
+
+    def publish(self, snapshot: ItemSnapshot):
+        try:
+            self.snapshots.put_nowait(snapshot)
+        except queue.Full:
+            # Replace the snapshot the UI hasn't picked up yet
+            try:
+                self.snapshots.get_nowait()
+            except queue.Empty:
+                pass
+            self.snapshots.put_nowait(snapshot)
+
+    def latest(self) -> Optional[ItemSnapshot]:
+        """Get the newest snapshot since the last call, if there is one."""
+        try:
+            return self.snapshots.get_nowait()
+        except queue.Empty:
+            return None
+
+    def run(self):
+        while not self.stopping.is_set():
+            start = time.monotonic()
+            previous = (self.counts, self.in_game, self.map_index)
+            try:
+                snapshot = self.poll()
+            except Exception as e:
+                self.in_game = False
+                snapshot = ItemSnapshot(self.counts, False, self.map_index, time.monotonic(), str(e))
+            self.publish(snapshot)
+            changed = previous != (snapshot.counts, snapshot.in_game, snapshot.map_index)
+            if changed and self.recorder is not None:
+                self.recorder.record(snapshot)
+            interval = self.scheduler.next_interval(snapshot.in_game, changed, snapshot.time)
+            self.stopping.wait(max(0.0, interval - (time.monotonic() - start)))
+
+    def stop(self):
+        self.stopping.set()
@@ -1,26 +1,122 @@
+import atexit
 import json
+import logging
 import os
+import threading
+import time
+from modules.stats import STATS
 
 PREFERENCE_JSON = "preferences.json"
 DEFAULT_PREFERENCE_JSON = "default_preferences.json"
+FLUSH_DELAY = 1.0  # Seconds without a change before writing to disk
+RELOAD_CHECK_INTERVAL = 1.0  # Seconds between checks for edits made outside the tracker
+FLUSH_RETRY_DELAY = 5.0  # Seconds before trying again when writing fails (read-only folder, full disk)
+
+log = logging.getLogger(__name__)
+
+class PreferenceStore:
+    """Preferences held in memory, written back once changes settle down."""
+
+    def __init__(self, path: str = PREFERENCE_JSON, default_path: str = DEFAULT_PREFERENCE_JSON):
+        self.path = path
+        self.lock = threading.RLock()
+        with open(default_path, "r") as fh:
+            self.defaults = json.load(fh)
+        self.data = {}
+        self.mtime = None
+        self.pending = {}  # Changes not yet written to disk
+        self.timer = None
+        self.last_check = time.monotonic()
+        self._load()
+        atexit.register(self.flush)
+
+    def _load(self):
+        self.mtime = self._current_mtime()
+        if self.mtime is None:
+            self.data = {}
+        else:
+            try:
+                with open(self.path, "r") as fh:
+                    self.data = json.load(fh)
+            except (OSError, ValueError):
+                # Caught mid-write or hand edited into invalid JSON, keep what we had
+                return
+        # Anything set but not yet flushed still wins
+        self.data.update(self.pending)
+
+    def _current_mtime(self):
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None
+
+    def _check_external_edit(self):
+        now = time.monotonic()
+        if now - self.last_check < RELOAD_CHECK_INTERVAL:
+            return
+        self.last_check = now
+        if self._current_mtime() != self.mtime:
+            self._load()
+
+    def get(self, attr):
+        start = STATS.start()
+        with self.lock:
+            self._check_external_edit()
+            value = self.data[attr] if attr in self.data else self.defaults[attr]
+        STATS.stop("preference_io", start)
+        return value
+
+    def set(self, attr, value):
+        with self.lock:
+            self.data[attr] = value
+            self.pending[attr] = value
+            self._schedule_flush(FLUSH_DELAY)
+
+    def _schedule_flush(self, delay: float):
+        if self.timer is not None:
+            self.timer.cancel()
+        self.timer = threading.Timer(delay, self.flush)
+        self.timer.daemon = True
+        self.timer.start()
+
+    def flush(self):
+        """Write any pending changes to disk."""
+        with self.lock:
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+            if not self.pending:
+                return
+            # Edits made outside the tracker since the last read are kept, only our own changes go on top
+            if self._current_mtime() != self.mtime:
+                self._load()
+            start = STATS.start()
+            temp_path = f"{self.path}.tmp"
+            try:
+                with open(temp_path, "w") as fh:
+                    json.dump(self.data, fh, indent=4)
+                os.replace(temp_path, self.path)
+            except OSError as e:
+                # Keep the changes pending and try again later
+                log.warning(f"Could not save preferences: {e}")
+                self._schedule_flush(FLUSH_RETRY_DELAY)
+                return
+            STATS.stop("preference_io", start)
+            self.pending.clear()
+            self.mtime = self._current_mtime()
+
+_store = None
+_store_lock = threading.Lock()
+
+def get_store() -> PreferenceStore:
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = PreferenceStore()
+        return _store
 
 def set_preference(attr, value):
-    data = {}
-    if os.path.exists(PREFERENCE_JSON):
-        with open(PREFERENCE_JSON, "r") as fh:
-            data = json.load(fh)
-    data[attr] = value
-    with open(PREFERENCE_JSON, "w") as fh:
-        json.dump(data, fh, indent=4)
+    get_store().set(attr, value)
 
 def get_preference(attr):
-    default_data = {}
-    with open(DEFAULT_PREFERENCE_JSON, "r") as fh:
-        default_data = json.load(fh)
-    if os.path.exists(PREFERENCE_JSON):
-        data = {}
-        with open(PREFERENCE_JSON, "r") as fh:
-            data = json.load(fh)
-        if attr in data:
-            return data[attr]
-    return default_data[attr]
\ No newline at end of file
+    return get_store().get(attr)
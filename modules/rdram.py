@@ -0,0 +1,14 @@
+import array
+import struct
+
+U32 = struct.Struct(">I")
+F32 = struct.Struct(">f")
+
+def unswizzle(raw) -> memoryview:
+    """Convert raw emulator RDRAM (little-endian words) to N64 (big-endian) byte order in one pass."""
+    if len(raw) & 3:
+        raise Exception(f"RDRAM buffer of {len(raw)} bytes is not word aligned")
+    words = array.array("I")
+    words.frombytes(raw)
+    words.byteswap()
+    return memoryview(words).cast("B")
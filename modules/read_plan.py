@@ -0,0 +1,133 @@
+from typing import Optional
+
+class ReadSpan:
+    """A contiguous region of memory read with a single call."""
+
+    def __init__(self, pointer: Optional[int], start: int, end: int):
+        self.pointer = pointer
+        self.start = start
+        self.end = end
+        self.data = b""
+        self.sources: set[str] = set()
+
+    @property
+    def size(self) -> int:
+        return self.end - self.start
+
+    @property
+    def source(self) -> Optional[str]:
+        """What the span is read for, for the read accounting."""
+        return "+".join(sorted(self.sources)) or None
+
+class ReadPlan:
+    """Merges every address the tracked items touch into as few reads as possible.
+
+    Reads are either absolute, or relative to a pointer which is itself read
+    from memory each poll (eg. the CountStruct). Pointers which aren't a
+    valid KSEG0 address cause every read relative to them to decode as 0.
+    """
+
+    def __init__(self, gap_tolerance: int = 0x100):
+        self.gap_tolerance = gap_tolerance
+        self.requests: list[tuple[Optional[int], int, int]] = []
+        self.sources: list[Optional[str]] = []
+        self.spans: list[ReadSpan] = []
+        self.slots: list[tuple[ReadSpan, int, int]] = []
+        self.pointer_slots: dict[int, int] = {}
+        self.values: list[int] = []
+        self.bases: dict[int, Optional[int]] = {}
+
+    def add(self, address: int, size: int, pointer: Optional[int] = None, source: Optional[str] = None) -> int:
+        """Register a read, returning the slot its decoded value will be stored in.
+
+        `source` names what the read is for (eg. the item type) in the read accounting.
+        """
+        request = (pointer, address, size)
+        if request in self.requests:
+            return self.requests.index(request)
+        if pointer is not None and pointer not in self.pointer_slots:
+            self.pointer_slots[pointer] = self.add(pointer, 4, source=source)
+        self.requests.append(request)
+        self.sources.append(source)
+        return len(self.requests) - 1
+
+    def compile(self):
+        """Group all registered reads into the fewest spans within the gap tolerance."""
+        self.spans = []
+        groups: dict[Optional[int], list[tuple[int, int]]] = {}
+        for pointer, address, size in self.requests:
+            groups.setdefault(pointer, []).append((address, address + size))
+        # Absolute spans come first so that pointers are resolved before use
+        for pointer in sorted(groups, key=lambda p: -1 if p is None else p):
+            ranges = sorted(groups[pointer])
+            span = ReadSpan(pointer, *ranges[0])
+            for start, end in ranges[1:]:
+                if start - span.end <= self.gap_tolerance:
+                    span.end = max(span.end, end)
+                else:
+                    self.spans.append(span)
+                    span = ReadSpan(pointer, start, end)
+            self.spans.append(span)
+        self.slots = []
+        for (pointer, address, size), source in zip(self.requests, self.sources):
+            span = next(
+                s for s in self.spans
+                if s.pointer == pointer and s.start <= address and address + size <= s.end
+            )
+            if source is not None:
+                span.sources.add(source)
+            self.slots.append((span, address - span.start, size))
+        self.values = [0] * len(self.requests)
+        self.bases = {}
+
+    def refresh(self, client):
+        """Read every span and decode the value of every slot.
+
+        Pointer-relative spans are read alongside the absolute spans using the
+        pointer values from the previous poll, so a poll is a single batched
+        read unless a pointer has moved since then.
+        """
+        self._read(client, self.spans)
+        stale = []
+        for pointer, slot in self.pointer_slots.items():
+            base = self.decode(slot)
+            base = base if (base >> 24) == 0x80 else None
+            if base != self.bases.get(pointer):
+                self.bases[pointer] = base
+                stale.extend(span for span in self.spans if span.pointer == pointer)
+        if stale:
+            self._read(client, stale)
+        self.values = [self.decode(slot) for slot in range(len(self.slots))]
+
+    def _read(self, client, spans: list[ReadSpan]):
+        readable = []
+        for span in spans:
+            if span.pointer is not None and self.bases.get(span.pointer) is None:
+                span.data = b""
+            else:
+                readable.append(span)
+        if not readable:
+            return
+        blocks = client.read_blocks([
+            (span.start if span.pointer is None else self.bases[span.pointer] + span.start, span.size)
+            for span in readable
+        ], [span.source for span in readable])
+        for span, data in zip(readable, blocks):
+            span.data = data
+
+    def decode(self, slot: int) -> int:
+        """Decode a big-endian value from the data last read for a slot."""
+        span, offset, size = self.slots[slot]
+        return int.from_bytes(span.data[offset:offset + size], "big")
+
+    def value(self, slot: int) -> int:
+        """Get the value of a slot from the last refresh."""
+        return self.values[slot]
+
+    @property
+    def byte_count(self) -> int:
+        return sum(span.size for span in self.spans)
+
+    def describe(self) -> str:
+        """Summarise the plan, for tuning the gap tolerance."""
+        return f"{len(self.spans)} spans, {self.byte_count} bytes from {len(self.requests)} reads"
@@ -0,0 +1,271 @@
+import lzma
+import os
+import queue
+import struct
+import threading
+import time
+import zlib
+from typing import Iterator, NamedTuple, Optional
+from modules.poller import ItemSnapshot
+
+SESSION_MAGIC = b"KBRS"
+SESSION_VERSION = 1
+SESSION_FOLDER = "sessions"
+SESSION_HEADER = struct.Struct("<4sBBHd")  # Magic, version, compression, item count, start time (unix)
+BLOCK_HEADER = struct.Struct("<HH")  # Stored size, raw size (with BLOCK_KEYFRAME set on blocks starting at a keyframe)
+BLOCK_KEYFRAME = 0x8000  # Block starts at a keyframe, and a fresh compression stream
+RECORD = struct.Struct("<IBHI")  # Milliseconds since start, kind, index, value
+
+RECORD_DELTA = 0  # Item at index changed to value
+RECORD_KEYFRAME = 1  # Item at index is value, one per item
+RECORD_GAME = 2  # Index is 1 when in game, value is the map
+
+COMPRESSION_NONE = 0
+COMPRESSION_ZLIB = 1
+COMPRESSION_LZMA = 2
+COMPRESSION_NAMES = {None: COMPRESSION_NONE, "none": COMPRESSION_NONE, "zlib": COMPRESSION_ZLIB, "lzma": COMPRESSION_LZMA}
+
+KEYFRAME_INTERVAL = 600.0  # Seconds between full keyframes, skipped when nothing changed
+BLOCK_SIZE = 4096  # Raw bytes collected before compressing and writing a block
+FLUSH_INTERVAL = 30.0  # Seconds a record may wait before its block is written anyway
+QUEUE_SIZE = 256  # Snapshots the writer can fall behind by before new ones are dropped
+LZMA_FILTERS = [{"id": lzma.FILTER_LZMA2, "preset": 9, "dict_size": BLOCK_SIZE * 16}]  # Raw with a small dictionary, blocks are tiny
+
+class _BlockCompressor:
+    """Compresses one block at a time.
+
+    zlib keeps a stream going from one keyframe to the next and sync flushes
+    after each block, so a block of a couple of records still compresses
+    against everything before it. Keyframe blocks start a new stream, so
+    they can be read without anything before them. lzma can't flush
+    mid-stream, so each of its blocks stands alone.
+    """
+
+    def __init__(self, kind: int):
+        self.kind = kind
+        self.stream = None
+
+    def compress(self, data: bytes, keyframe: bool = False) -> bytes:
+        if self.kind == COMPRESSION_ZLIB:
+            if keyframe or self.stream is None:
+                self.stream = zlib.compressobj(9, zlib.DEFLATED, -15)
+            return self.stream.compress(data) + self.stream.flush(zlib.Z_SYNC_FLUSH)
+        if self.kind == COMPRESSION_LZMA:
+            return lzma.compress(data, lzma.FORMAT_RAW, filters=LZMA_FILTERS)
+        return data
+
+class _BlockDecompressor:
+    def __init__(self, kind: int):
+        self.kind = kind
+        self.stream = None
+
+    def decompress(self, data: bytes, keyframe: bool = False) -> bytes:
+        if self.kind == COMPRESSION_ZLIB:
+            if keyframe or self.stream is None:
+                self.stream = zlib.decompressobj(-15)
+            return self.stream.decompress(data)
+        if self.kind == COMPRESSION_LZMA:
+            return lzma.decompress(data, lzma.FORMAT_RAW, filters=LZMA_FILTERS)
+        return data
+
+class SessionRecorder(threading.Thread):
+    """Append-only recording of item changes over a session.
+
+    The file holds a header and the item names, then blocks of fixed width
+    records, each written out whole so a crash only loses the block being
+    collected. Only changes are recorded, plus a full keyframe now and
+    then. Each keyframe starts a new block, which a reader can start from
+    without replaying everything before it.
+    record() and close() never block, snapshots are handed to a writer
+    thread. One recorder can be fed by several pollers in turn, so a session
+    carries on across reconnects.
+    """
+
+    def __init__(self, path: str, item_names: list[str], compression: Optional[str] = "zlib"):
+        super().__init__(name="SessionRecorder", daemon=True)
+        self.path = path
+        self.compression = COMPRESSION_NAMES[compression]
+        self.compressor = _BlockCompressor(self.compression)
+        self.snapshots = queue.Queue(maxsize=QUEUE_SIZE)
+        self.closing = threading.Event()
+        self.dropped = 0
+        self.start_time = time.monotonic()
+        self.counts = None
+        self.game = None
+        self.last_keyframe = None
+        self.changed_since_keyframe = False
+        self.block = bytearray()
+        self.block_started = None
+        self.block_keyframe = False
+        # Never write over an earlier session
+        self.fh = open(path, "xb")
+        self._write_header(item_names)
+        self.start()
+
+    @classmethod
+    def in_folder(cls, item_names: list[str], compression: Optional[str] = "zlib", folder: str = SESSION_FOLDER) -> "SessionRecorder":
+        """Start recording to a new timestamped file."""
+        os.makedirs(folder, exist_ok=True)
+        stem = os.path.join(folder, time.strftime("session-%Y%m%d-%H%M%S"))
+        path = f"{stem}.kbr"
+        suffix = 1
+        while os.path.exists(path):
+            suffix += 1
+            path = f"{stem}-{suffix}.kbr"
+        return cls(path, item_names, compression)
+
+    def _write_header(self, item_names: list[str]):
+        header = bytearray(SESSION_HEADER.pack(SESSION_MAGIC, SESSION_VERSION, self.compression, len(item_names), time.time()))
+        for name in item_names:
+            encoded = name.encode()
+            header += bytes([len(encoded)]) + encoded
+        self.fh.write(header)
+        self.fh.flush()
+
+    def record(self, snapshot: ItemSnapshot):
+        """Queue a snapshot, dropping it if the writer has fallen behind."""
+        if self.closing.is_set():
+            return
+        try:
+            self.snapshots.put_nowait(snapshot)
+        except queue.Full:
+            # Deltas are against the last written state, so a drop only loses timing
+            self.dropped += 1
+
+    def _add(self, millis: int, kind: int, index: int, value: int):
+        if not self.block:
+            self.block_started = time.monotonic()
+        self.block += RECORD.pack(millis, kind, index, value)
+
+    def _write(self, snapshot: ItemSnapshot):
+        if snapshot.error is not None:
+            return
+        millis = max(0, int((snapshot.time - self.start_time) * 1000))
+        game = (snapshot.in_game, snapshot.map_index)
+        keyframe_due = self.last_keyframe is None or (
+            self.changed_since_keyframe and snapshot.time - self.last_keyframe >= KEYFRAME_INTERVAL
+        )
+        if keyframe_due:
+            self._flush_block()
+            self.block_keyframe = True
+        if game != self.game or keyframe_due:
+            # Keyframes carry the game state too, so they describe everything
+            self.game = game
+            self._add(millis, RECORD_GAME, int(snapshot.in_game), snapshot.map_index & 0xFFFFFFFF)
+        if keyframe_due:
+            for index, value in enumerate(snapshot.counts):
+                self._add(millis, RECORD_KEYFRAME, index, value)
+            self.last_keyframe = snapshot.time
+            self.changed_since_keyframe = False
+        else:
+            for index, (value, old) in enumerate(zip(snapshot.counts, self.counts)):
+                if value != old:
+                    self._add(millis, RECORD_DELTA, index, value)
+                    self.changed_since_keyframe = True
+        self.counts = snapshot.counts
+
+    def _flush_block(self):
+        if not self.block:
+            return
+        data = self.compressor.compress(bytes(self.block), self.block_keyframe)
+        raw_size = len(self.block) | (BLOCK_KEYFRAME if self.block_keyframe else 0)
+        self.fh.write(BLOCK_HEADER.pack(len(data), raw_size) + data)
+        self.fh.flush()
+        self.block.clear()
+        self.block_keyframe = False
+
+    def run(self):
+        while True:
+            timeout = None
+            if self.block:
+                timeout = max(0.0, FLUSH_INTERVAL - (time.monotonic() - self.block_started))
+            try:
+                snapshot = self.snapshots.get(timeout=timeout)
+            except queue.Empty:
+                self._flush_block()
+                continue
+            if snapshot is None:
+                break
+            self._write(snapshot)
+            if len(self.block) >= BLOCK_SIZE:
+                self._flush_block()
+            if self.closing.is_set() and self.snapshots.empty():
+                break
+        self._flush_block()
+        self.fh.close()
+
+    def close(self, timeout: Optional[float] = None):
+        """Write whatever is left and stop the writer.
+
+        Returns straight away, unless given a timeout to wait for the file to be finished.
+        """
+        self.closing.set()
+        try:
+            # Wake the writer, if the queue is full it finishes once that's written
+            self.snapshots.put_nowait(None)
+        except queue.Full:
+            pass
+        if timeout is not None:
+            self.join(timeout)
+
+class SessionRecord(NamedTuple):
+    time: float  # Seconds since the session started
+    kind: int
+    index: int
+    value: int
+
+class SessionReader:
+    """Reads back a file written by SessionRecorder."""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as fh:
+            self.data = fh.read()
+        magic, version, self.compression, item_count, self.start_time = SESSION_HEADER.unpack_from(self.data)
+        if magic != SESSION_MAGIC or version != SESSION_VERSION:
+            raise ValueError(f"{path} is not a Krossbones session recording")
+        offset = SESSION_HEADER.size
+        self.item_names = []
+        for _ in range(item_count):
+            length = self.data[offset]
+            self.item_names.append(self.data[offset + 1:offset + 1 + length].decode())
+            offset += 1 + length
+        self.blocks_offset = offset
+
+    def _blocks(self, offset: int) -> Iterator[tuple[int, int, bytes]]:
+        """Yield (offset, raw size with flags, stored data) for every whole block from an offset."""
+        while offset + BLOCK_HEADER.size <= len(self.data):
+            stored_size, raw_size = BLOCK_HEADER.unpack_from(self.data, offset)
+            start = offset + BLOCK_HEADER.size
+            if start + stored_size > len(self.data):
+                # Cut off mid-write
+                return
+            yield offset, raw_size, self.data[start:start + stored_size]
+            offset = start + stored_size
+
+    def keyframes(self) -> list[int]:
+        """Offsets of the blocks starting at a keyframe, for records() to start from."""
+        return [offset for offset, raw_size, _ in self._blocks(self.blocks_offset) if raw_size & BLOCK_KEYFRAME]
+
+    def records(self, offset: Optional[int] = None) -> Iterator[SessionRecord]:
+        """Every record from the start, or from a block offset given by keyframes()."""
+        decompressor = _BlockDecompressor(self.compression)
+        for _, raw_size, data in self._blocks(self.blocks_offset if offset is None else offset):
+            keyframe = bool(raw_size & BLOCK_KEYFRAME)
+            block = decompressor.decompress(data, keyframe)
+            for millis, kind, index, value in RECORD.iter_unpack(block[:raw_size & ~BLOCK_KEYFRAME]):
+                yield SessionRecord(millis / 1000, kind, index, value)
+
+    def states(self) -> Iterator[tuple[float, dict]]:
+        """Every item count after each poll that changed something, as (seconds since start, {name: count})."""
+        counts = {}
+        pending = None
+        for record in self.records():
+            if pending is not None and record.time != pending:
+                yield pending, dict(counts)
+                pending = None
+            if record.kind == RECORD_GAME:
+                continue
+            counts[self.item_names[record.index]] = record.value
+            pending = record.time
+        if pending is not None:
+            yield pending, dict(counts)
@@ -0,0 +1,262 @@
+import array
+import json
+import mmap
+import os
+import random
+import struct
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple, Union
+from loader import EMULATOR_CONFIGS, EmulatorInfo, Emulators, ProcessMemory, ProcessTable
+
+RDRAM_SIZE = 0x800000
+REPLAY_PID = 0
+REPLAY_MODULE_BASE = 0x7F0000000000  # Where the emulator library "lives" in the fake address space
+REPLAY_RDRAM_BASE = 0x7E0000000000  # Where RDRAM lives, for emulators that find it through a pointer
+
+class ReplayFrame(NamedTuple):
+    """RDRAM from `time` seconds into the replay.
+
+    A frame either swaps in a whole dump, or patches the previous frame with
+    (N64 address, big-endian bytes) pairs.
+    """
+    time: float
+    dump: Union[str, bytes, None] = None
+    patches: Sequence[Tuple[int, bytes]] = ()
+
+class ReplayModule(NamedTuple):
+    name: str
+    lpBaseOfDll: int
+
+class ManualClock:
+    """A clock which only moves when told to, for deterministic replays."""
+
+    def __init__(self, now: float = 0.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float):
+        self.now += seconds
+
+def swizzle(data: bytes) -> bytearray:
+    """Convert N64 (big-endian) RDRAM to the little-endian words emulators keep it in."""
+    words = array.array("I")
+    words.frombytes(bytes(data[:len(data) & ~3]))
+    if sys.byteorder == "little":
+        words.byteswap()
+    return bytearray(words.tobytes())
+
+def save_rdram_dump(emulator_info: EmulatorInfo, path: str):
+    """Save a connected emulator's RDRAM as-is, for replaying later."""
+    data = emulator_info.connected_process.read_bytes(emulator_info.connected_offset, RDRAM_SIZE, 0x80000000)
+    with open(path, "wb") as fh:
+        fh.write(data)
+
+class ReplaySource:
+    """RDRAM played back from dumps on a clock, shared by every ReplayMemory reading it.
+
+    Dumps are expected in the emulator's word-swizzled layout, as written by
+    save_rdram_dump, and are mmapped rather than loaded. Pass swizzled=False
+    for dumps in N64 byte order, these are converted up front.
+    """
+
+    def __init__(self, frames: List[ReplayFrame], swizzled: bool = True, clock: Callable[[], float] = time.monotonic, loop_after: Optional[float] = None):
+        if not frames or frames[0].dump is None:
+            raise ValueError("A replay has to start with a full dump")
+        self.frames = sorted(frames, key=lambda frame: frame.time)
+        self.swizzled = swizzled
+        self.clock = clock
+        self.loop_after = loop_after
+        self.start = clock()
+        self.lock = threading.Lock()
+        self.dumps: Dict[int, Union[mmap.mmap, bytes, bytearray]] = {}
+        self.files = []
+        self.index = -1
+        self.current: Union[mmap.mmap, bytes, bytearray] = b""
+        self.copied = False  # Whether current is our own copy, safe to patch
+        self._advance()
+
+    @classmethod
+    def from_path(cls, path: str, clock: Callable[[], float] = time.monotonic) -> "ReplaySource":
+        """Load a single dump, or a JSON manifest describing a sequence of them.
+
+        A manifest looks like:
+            {"swizzled": true, "loop_after": 60, "frames": [
+                {"time": 0, "dump": "start.bin"},
+                {"time": 2.5, "patches": [["0x807FC952", "01"]]}
+            ]}
+        with dump paths relative to the manifest.
+        """
+        if not path.lower().endswith(".json"):
+            return cls([ReplayFrame(0.0, path)], clock=clock)
+        with open(path, "r") as fh:
+            manifest = json.load(fh)
+        folder = os.path.dirname(path)
+        frames = []
+        for entry in manifest["frames"]:
+            dump = entry.get("dump")
+            if dump is not None:
+                dump = os.path.join(folder, dump)
+            patches = [(int(address, 16), bytes.fromhex(data)) for address, data in entry.get("patches", [])]
+            frames.append(ReplayFrame(float(entry.get("time", 0)), dump, patches))
+        return cls(frames, manifest.get("swizzled", True), clock, manifest.get("loop_after"))
+
+    def _load(self, index: int) -> Union[mmap.mmap, bytes, bytearray]:
+        if index in self.dumps:
+            return self.dumps[index]
+        dump = self.frames[index].dump
+        if isinstance(dump, str):
+            fh = open(dump, "rb")
+            self.files.append(fh)
+            data = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            data = dump
+        if not self.swizzled:
+            data = swizzle(data)
+        self.dumps[index] = data
+        return data
+
+    def _patch(self, address: int, data: bytes):
+        if not self.copied:
+            self.current = bytearray(self.current)
+            self.copied = True
+        address &= 0x7FFFFFFF
+        for i, value in enumerate(data):
+            n64_address = address + i
+            self.current[(n64_address & ~3) | (3 - (n64_address & 3))] = value
+
+    def _advance(self):
+        elapsed = self.clock() - self.start
+        if self.loop_after:
+            elapsed %= self.loop_after
+        target = 0
+        while target + 1 < len(self.frames) and self.frames[target + 1].time <= elapsed:
+            target += 1
+        if target == self.index:
+            return
+        if target < self.index:
+            # Looped around, rebuild from the start
+            self.index = -1
+        for index in range(self.index + 1, target + 1):
+            frame = self.frames[index]
+            if frame.dump is not None:
+                self.current = self._load(index)
+                self.copied = False
+            for address, data in frame.patches:
+                self._patch(address, data)
+        self.index = target
+
+    def rdram(self) -> Union[mmap.mmap, bytes, bytearray]:
+        """Get RDRAM as it is now."""
+        with self.lock:
+            self._advance()
+            return self.current
+
+    def close(self):
+        for data in self.dumps.values():
+            if isinstance(data, mmap.mmap):
+                data.close()
+        for fh in self.files:
+            fh.close()
+        self.dumps.clear()
+        self.files.clear()
+
+class ReplayMemory(ProcessMemory):
+    """ProcessMemory serving reads from a ReplaySource instead of a process.
+
+    Memory is laid out the way the given emulator's attach scan expects, so
+    attach_to_emulator finds RDRAM exactly as it would in the real thing.
+    """
+
+    def __init__(self, source: ReplaySource, emulator_info: EmulatorInfo, filler: bytes = b""):
+        self.source = source
+        super().__init__(emulator_info.process_name, REPLAY_PID)
+        self.use_vm_readv = False
+        self.closed = False
+        self.module_name = emulator_info.get_library_name()
+        self.module_base = REPLAY_MODULE_BASE if emulator_info.find_dll else 0
+        # Filler sits in the scanned range before RDRAM (or the pointer to it), so the scan has to get past it
+        filler = filler[:len(filler) - len(filler) % emulator_info.range_step]
+        scan_start = self.module_base + emulator_info.lower_offset_range
+        self.static_regions: List[Tuple[int, bytes]] = []
+        if emulator_info.additional_lookup:
+            # RDRAM is found through a pointer in the scanned range
+            self.rdram_address = REPLAY_RDRAM_BASE
+            pointer = struct.pack("<Q", REPLAY_RDRAM_BASE - emulator_info.extra_offset)
+            if filler:
+                self.static_regions.append((scan_start, filler))
+            self.static_regions.append((scan_start + len(filler), pointer))
+        else:
+            self.rdram_address = scan_start + emulator_info.extra_offset + len(filler)
+            if filler:
+                self.static_regions.append((self.rdram_address - len(filler), filler))
+
+    def _open(self):
+        # Nothing to open, reads are served from the source
+        return
+
+    def _regions(self) -> List[Tuple[int, Any]]:
+        regions = list(self.static_regions)
+        regions.append((self.rdram_address, self.source.rdram()))
+        regions.sort(key=lambda region: region[0])
+        return regions
+
+    def list_modules(self):
+        if not self.module_base:
+            return []
+        return [ReplayModule(self.module_name, self.module_base)]
+
+    def readable_regions(self) -> Optional[List[Tuple[int, int]]]:
+        return [(address, address + len(data)) for address, data in self._regions()]
+
+    def _read(self, regions: List[Tuple[int, Any]], address: int, size: int, n64_addr: int) -> bytes:
+        for start, data in regions:
+            if start <= address and address + size <= start + len(data):
+                return bytes(data[address - start:address - start + size])
+        raise Exception(f"Failed to read {size} bytes at address 0x{address:08x} (N64: 0x{n64_addr:08x})")
+
+    def read_bytes(self, address: int, size: int, n64_addr: int = 0) -> bytes:
+        return bytes(self.read_scatter([(address, size)], n64_addr))
+
+    def read_scatter(self, reads: List[Tuple[int, int]], n64_addr: int = 0) -> bytearray:
+        # Accounted as one round trip, the way process_vm_readv would serve it
+        if self.closed:
+            raise Exception("Process not attached")
+        first = reads[0][0] if reads else 0
+        start = time.perf_counter_ns()
+        buffer = bytearray()
+        try:
+            regions = self._regions()
+            for address, size in reads:
+                buffer += self._read(regions, address, size, n64_addr)
+        except Exception as e:
+            self.accounting.syscall(first, sum(size for _, size in reads), time.perf_counter_ns() - start, False, str(e))
+            raise
+        self.accounting.syscall(first, len(buffer), time.perf_counter_ns() - start)
+        return buffer
+
+    def start_time(self) -> Optional[int]:
+        # Never cache a replay's offset against a real process
+        return None
+
+    def close(self):
+        self.closed = True
+
+class ReplayProcessTable(ProcessTable):
+    """A process table holding only the replayed emulator, for connect_to_emulator."""
+
+    def __init__(self, source: ReplaySource, emulator: Emulators = Emulators.RMG, scan_depth: int = 0, filler: Optional[bytes] = None):
+        """scan_depth puts RDRAM that many bytes of noise into the attach scan, rather than right at the start.
+
+        Pass filler to choose what the scan has to get past instead.
+        """
+        self.source = source
+        self.emulator_info = EMULATOR_CONFIGS[emulator]
+        self.filler = filler if filler is not None else random.Random(scan_depth).randbytes(scan_depth)
+        super().__init__([{"name": self.emulator_info.process_name, "pid": REPLAY_PID}])
+
+    def open(self, proc: Dict[str, Any]) -> ProcessMemory:
+        return ReplayMemory(self.source, self.emulator_info, self.filler)
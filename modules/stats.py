@@ -0,0 +1,103 @@
+import collections
+import json
+import threading
+import time
+
+STATS_JSON = "stats.json"
+STATS_WINDOW = 512  # Samples kept per stage for the rolling percentiles and histogram
+HISTOGRAM_BUCKETS_MS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100)
+
+class Stats:
+    """Timings for each stage of a frame, and counters for the work done in them.
+
+    Everything is a no-op while disabled, so the calls can stay in hot paths:
+
+        start = STATS.start()
+        ...
+        STATS.stop("memory_read", start)
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.samples = {}  # stage -> recent durations in ns
+            self.totals = collections.Counter()  # stage -> total ns
+            self.calls = collections.Counter()  # stage -> times timed
+            self.counters = collections.Counter()
+            self.since = time.monotonic()
+
+    def set_enabled(self, enabled: bool):
+        if enabled and not self.enabled:
+            # Don't blend in whatever was collected before it was last switched off
+            self.reset()
+        self.enabled = enabled
+
+    def start(self) -> int:
+        return time.perf_counter_ns() if self.enabled else 0
+
+    def stop(self, stage: str, start: int):
+        if not start or not self.enabled:
+            return
+        elapsed = time.perf_counter_ns() - start
+        with self.lock:
+            if stage not in self.samples:
+                self.samples[stage] = collections.deque(maxlen=STATS_WINDOW)
+            self.samples[stage].append(elapsed)
+            self.totals[stage] += elapsed
+            self.calls[stage] += 1
+
+    def count(self, counter: str, amount: int = 1):
+        if not self.enabled:
+            return
+        with self.lock:
+            self.counters[counter] += amount
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            stages = {}
+            for stage, samples in self.samples.items():
+                ordered = sorted(samples)
+                histogram = collections.Counter()
+                for sample in ordered:
+                    ms = sample / 1e6
+                    bucket = next((f"<{limit}ms" for limit in HISTOGRAM_BUCKETS_MS if ms < limit), f">={HISTOGRAM_BUCKETS_MS[-1]}ms")
+                    histogram[bucket] += 1
+                stages[stage] = {
+                    "calls": self.calls[stage],
+                    "total_ms": round(self.totals[stage] / 1e6, 3),
+                    "p50_ms": round(ordered[len(ordered) // 2] / 1e6, 4),
+                    "p95_ms": round(ordered[min(len(ordered) - 1, len(ordered) * 95 // 100)] / 1e6, 4),
+                    "max_ms": round(ordered[-1] / 1e6, 4),
+                    "histogram": dict(histogram),
+                }
+            return {
+                "enabled": self.enabled,
+                "seconds": round(time.monotonic() - self.since, 1),
+                "stages": stages,
+                "counters": dict(self.counters),
+            }
+
+    def describe(self) -> str:
+        """Summary for the debug panel."""
+        snapshot = self.snapshot()
+        if not snapshot["enabled"]:
+            return "Timing disabled"
+        lines = [f"Last {snapshot['seconds']}s"]
+        for stage, timing in sorted(snapshot["stages"].items()):
+            lines.append(f"{stage:<16} n={timing['calls']:<7} p50 {timing['p50_ms']:.3f}ms  p95 {timing['p95_ms']:.3f}ms  max {timing['max_ms']:.3f}ms")
+        for counter, value in sorted(snapshot["counters"].items()):
+            lines.append(f"{counter:<16} {value}")
+        return "\n".join(lines)
+
+    def dump(self, path: str = STATS_JSON, extra: dict = None):
+        """Write the snapshot as JSON, along with any extra sections."""
+        snapshot = self.snapshot()
+        snapshot.update(extra or {})
+        with open(path, "w") as fh:
+            json.dump(snapshot, fh, indent=4)
+
+STATS = Stats()
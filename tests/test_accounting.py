@@ -0,0 +1,34 @@
+import unittest
+
+from modules.accounting import ReadAccounting
+
+class ReadAccountingTest(unittest.TestCase):
+    def test_histogram_counts_every_syscall(self):
+        accounting = ReadAccounting()
+        with accounting.caller("poll"):
+            accounting.syscall(0x1000, 4, 5000)
+            # A seek and a read, recorded together
+            accounting.syscall(0x2000, 8, 40000, count=2)
+            accounting.syscall(0x3000, 4, 2000000, ok=False, error="EFAULT", count=2)
+        stats = accounting.snapshot()["callers"]["poll"]
+        self.assertEqual(stats["syscalls"], 5)
+        self.assertEqual(sum(stats["latency"]["histogram"].values()), stats["syscalls"])
+        self.assertEqual(stats["failed"], 2)
+        self.assertEqual(stats["syscalls_per_call"], 5)
+        # Latency is per syscall, not per recorded pair
+        self.assertEqual(stats["latency"]["histogram"], {"<=10us": 1, "<=25us": 2, "<=1000us": 2})
+        self.assertEqual(stats["latency"]["max_us"], 1000.0)
+
+    def test_reads_are_counted_by_caller_source_and_region(self):
+        accounting = ReadAccounting()
+        with accounting.caller("poll"):
+            accounting.read(0x807FC950, 0x1D6, "KongBase")
+            accounting.read(0x807ECEA8, 4)
+        snapshot = accounting.snapshot()
+        self.assertEqual(snapshot["callers"]["poll"]["reads"], 2)
+        self.assertEqual(snapshot["callers"]["poll"]["bytes"], 0x1DA)
+        self.assertEqual(snapshot["sources"], {"KongBase": {"reads": 1, "bytes": 0x1D6}, "poll": {"reads": 1, "bytes": 4}})
+        self.assertEqual(set(snapshot["regions"]), {"0x807F0000", "0x807E0000"})
+
+if __name__ == "__main__":
+    unittest.main()
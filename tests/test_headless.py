@@ -0,0 +1,81 @@
+import json
+import os
+import threading
+import time
+import unittest
+
+import headless
+from benchmark import synthetic_rdram
+from loader import Emulators
+from modules.replay import ReplayFrame, ReplayProcessTable, ReplaySource, swizzle
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+class Stop(Exception):
+    pass
+
+class ListOutput:
+    """Collects the stream's events, stopping the tracker once told to."""
+
+    def __init__(self):
+        self.events = []
+        self.stopping = threading.Event()
+
+    def accept(self, greeting):
+        if self.stopping.is_set():
+            raise Stop()
+
+    def send(self, line: str):
+        self.events.append(json.loads(line))
+
+    def close(self):
+        return
+
+class HeadlessReconnectTest(unittest.TestCase):
+    def setUp(self):
+        # Preferences and the attach cache are found relative to the project
+        self.cwd = os.getcwd()
+        os.chdir(ROOT)
+        self.reconnect_delay = headless.RECONNECT_DELAY
+        self.error_reconnect_after = headless.ERROR_RECONNECT_AFTER
+        headless.RECONNECT_DELAY = 0.05
+        headless.ERROR_RECONNECT_AFTER = 0.2
+
+    def tearDown(self):
+        headless.RECONNECT_DELAY = self.reconnect_delay
+        headless.ERROR_RECONNECT_AFTER = self.error_reconnect_after
+        os.chdir(self.cwd)
+
+    def wait_for(self, output, condition, timeout=10.0):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if any(condition(event) for event in list(output.events)):
+                return
+            time.sleep(0.02)
+        self.fail(f"Timed out, events: {output.events}")
+
+    def test_reconnects_when_reads_keep_failing(self):
+        source = ReplaySource([ReplayFrame(0.0, bytes(swizzle(synthetic_rdram())))])
+        output = ListOutput()
+        tracker = headless.HeadlessKrossbones(output)
+        tracker.process_table = ReplayProcessTable(source, Emulators.RMG)
+        thread = threading.Thread(target=lambda: self.assertRaises(Stop, tracker.run), daemon=True)
+        thread.start()
+        try:
+            self.wait_for(output, lambda event: event["event"] == "state")
+            first_process = tracker.memory_client.emulator_info.connected_process
+            # The emulator goes away mid-run
+            first_process.closed = True
+            self.wait_for(output, lambda event: event["event"] == "error" and event["message"])
+            self.wait_for(output, lambda event: event["event"] == "status" and event["state"] == "disconnected")
+            states = lambda: [event for event in output.events if event["event"] == "state"]
+            self.wait_for(output, lambda event: len(states()) >= 2)
+            self.assertIsNone(states()[-1]["error"])
+            self.assertIsNot(tracker.memory_client.emulator_info.connected_process, first_process)
+        finally:
+            output.stopping.set()
+            thread.join(5)
+            source.close()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,43 @@
+import json
+import os
+import tempfile
+import unittest
+
+from benchmark import synthetic_rdram
+from loader import ATTACH_CACHE_JSON, EMULATOR_CONFIGS, Emulators
+from modules.replay import ReplayFrame, ReplayMemory, ReplaySource, swizzle
+
+class AttachCacheTest(unittest.TestCase):
+    def setUp(self):
+        # The attach cache is found relative to the working directory
+        self.cwd = os.getcwd()
+        self.tmp = tempfile.TemporaryDirectory()
+        os.chdir(self.tmp.name)
+        self.source = ReplaySource([ReplayFrame(0.0, bytes(swizzle(synthetic_rdram())))])
+        self.emulator = EMULATOR_CONFIGS[Emulators.RMG]
+        self.pm = ReplayMemory(self.source, self.emulator)
+        # Replays never cache, so pretend this is a real process
+        self.pm.start_time = lambda: 1234
+        with open(ATTACH_CACHE_JSON, "w") as fh:
+            json.dump({self.emulator.id.name: {
+                "pid": self.pm.process_id,
+                "start_time": 1234,
+                "module_base": self.pm.module_base,
+                "offset": self.pm.rdram_address,
+            }}, fh)
+
+    def tearDown(self):
+        self.source.close()
+        os.chdir(self.cwd)
+        self.tmp.cleanup()
+
+    def test_reuses_offset_while_module_stays_put(self):
+        self.assertEqual(self.emulator._check_attach_cache(self.pm), self.pm.rdram_address)
+
+    def test_rejects_offset_once_module_moves(self):
+        # RDRAM is still where the cache says, but the library it was found through was reloaded elsewhere
+        self.pm.module_base += 0x1000000
+        self.assertIsNone(self.emulator._check_attach_cache(self.pm))
+
+if __name__ == "__main__":
+    unittest.main()